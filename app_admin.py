@@ -1,50 +1,200 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session, current_app, stream_with_context, g, has_app_context
 import json
+import re
+import logging
 from datetime import datetime, timedelta
 import os
 import sqlite3
 import csv
 import io
-import pandas as pd
 import uuid
 import functools
+import itertools
+from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 import hashlib
+import hmac
 import math
+import time
+import openpyxl
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
 # Constants
-VALID_ROLES = ['admin', 'field_agent']
-VALID_FILE_EXTENSIONS = ['.csv', '.xlsx', '.xls']
+VALID_ROLES = frozenset(('admin', 'field_agent'))
+VALID_FILE_EXTENSIONS = ('.csv', '.xlsx', '.xls')
+USER_FILTER_FIELDS = frozenset(('region', 'state', 'lga'))
+OUTLET_FILTER_FIELDS = frozenset(('region', 'state', 'local_govt'))
 REQUIRED_USER_FIELDS = ['username', 'password', 'full_name', 'role', 'region']
 REQUIRED_OUTLET_FIELDS = ['urn', 'outlet_name', 'region']
-OPTIONAL_USER_FIELDS = ['state', 'lga']
-OPTIONAL_OUTLET_FIELDS = ['customer_name', 'address', 'phone', 'outlet_type', 'local_govt', 'state']
+# Field order of the positional rows returned by user_preview/outlet_preview
+USER_PREVIEW_COLUMNS = ('id', 'username', 'full_name', 'role', 'region', 'state', 'lga', 'executions')
+OUTLET_PREVIEW_COLUMNS = ('id', 'urn', 'outlet_name', 'customer_name', 'outlet_type', 'region', 'state',
+                          'local_govt', 'executions')
+# Column order of the INSERTs that user_import/outlet_import feed from process_csv_data
+USER_IMPORT_COLUMNS = ('username', 'password', 'full_name', 'role', 'region', 'state', 'lga')
+OUTLET_IMPORT_COLUMNS = ('urn', 'outlet_name', 'customer_name', 'address', 'phone', 'outlet_type',
+                         'local_govt', 'state', 'region')
+# Accepted execution upload column names per standard column
+EXECUTION_COLUMN_MAPPING = {
+    'URN': ['URN', 'urn', 'Urn', 'URN Code', 'Outlet URN'],
+    'Retail Point Name': ['Retail Point Name', 'Outlet Name', 'Shop Name', 'Point Name', 'Name'],
+    'Customer Name': ['Customer Name', 'Customer', 'Owner Name', 'Owner'],
+    'Address': ['Address', 'Location', 'Full Address'],
+    'Phone': ['Phone', 'Phone Number', 'Contact', 'Mobile'],
+    'Region': ['Region', 'Zone'],
+    'State': ['State'],
+    'LGA': ['LGA', 'Local Govt', 'Local Government', 'Local Government Area'],
+    'Outlet Type': ['Outlet Type', 'Type', 'Shop Type'],
+    'Date': ['Date', 'Execution Date', 'Visit Date'],
+    'Status': ['Status', 'Execution Status'],
+    'Notes': ['Notes', 'Comments', 'Remarks'],
+    'Table': ['Table'],
+    'Chair': ['Chair'],
+    'Parasol': ['Parasol'],
+    'Tarpaulin': ['Tarpaulin'],
+    'Hawker Jacket': ['Hawker Jacket']
+}
+def canonical_column(name):
+    """Normalize a column header for alias matching (case and whitespace insensitive)"""
+    return re.sub(r'\s+', ' ', str(name).strip().lower())
+
+# Reverse lookup: canonical alias -> standard column
+EXECUTION_COLUMN_ALIASES = {
+    canonical_column(alias): standard_col
+    for standard_col, aliases in EXECUTION_COLUMN_MAPPING.items()
+    for alias in aliases
+}
+EXECUTION_DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%Y-%m-%d %H:%M:%S')
+PRODUCT_COLUMNS = ('Table', 'Chair', 'Parasol', 'Tarpaulin', 'Hawker Jacket')
+PRODUCT_TRUE_VALUES = frozenset(('true', '1', 'yes', 'y', 'available', 'present'))
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 500
+COUNT_CACHE_TTL = 30  # seconds
+DB_INFO_CACHE_TTL = 60  # seconds
+DASHBOARD_CACHE_TTL = 60  # seconds
+COUNT_WORKERS = 4
+SQL_BATCH_SIZE = 500
+DB_MANAGEMENT_PASSWORD = os.environ.get('DB_MANAGEMENT_PASSWORD', 'brobotDevMadeThisallTime123?').encode()
+UPLOAD_CHUNK_SIZE = 5000
+EXPORT_FETCH_SIZE = 1000
+MAX_PREVIEW_ROWS = 500
+MAX_UPLOAD_JOBS = 100  # finished upload jobs kept for status lookups
+UPLOAD_JOB_TIMEOUT = 3600  # seconds; a job left unfinished this long was lost with its worker
+UPLOAD_JOB_ID_RE = re.compile(r'[0-9a-f]{32}')
+UPLOAD_LOCK_TIMEOUT = 600  # seconds an upload waits for another process to release the write lock
+SELECT_QUERY_RE = re.compile(r'\s*SELECT\b', re.IGNORECASE)
+
+# Sample outlet import file, rendered once at import time
+SAMPLE_OUTLET_ROWS = (
+    ('urn', 'outlet_name', 'customer_name', 'address', 'phone', 'outlet_type', 'local_govt', 'state', 'region'),
+    ('DCP/22/SW/ED/1000009', 'SAMPLE OUTLET', 'JOHN DOE', '123 SAMPLE STREET', '08012345678', 'Shop', 'EGOR', 'EDO', 'SW'),
+    ('DCP/22/SE/AN/2000001', 'ANOTHER OUTLET', 'JANE SMITH', '456 ANOTHER ROAD', '09087654321', 'CONTAINER', 'NNEWI', 'ANAMBRA', 'SE'),
+    ('DCP/22/NW/KN/3000001', 'THIRD OUTLET', 'AHMED YUSUF', '789 THIRD AVENUE', '07023456789', 'Pallet', 'KANO', 'KANO', 'NW'),
+)
+SAMPLE_OUTLET_CSV = ''.join(','.join(row) + '\n' for row in SAMPLE_OUTLET_ROWS).encode('utf-8')
+SAMPLE_OUTLET_ETAG = hashlib.md5(SAMPLE_OUTLET_CSV).hexdigest()
+
+# products_available JSON for every combination of product flags (2**5 entries)
+PRODUCT_FLAGS_JSON = {
+    flags: json.dumps(dict(zip(PRODUCT_COLUMNS, flags)))
+    for flags in itertools.product((False, True), repeat=len(PRODUCT_COLUMNS))
+}
+
+# Database settings applied once per process
+_db_static_info = {}
+
+# Cached table row counts: {table: (timestamp, count)}
+_count_cache = {}
+
+# Dashboard counts and recent activity: {'time': timestamp, 'value': (stats, recent_activity)}
+_dashboard_cache = {}
+
+# Execution uploads run one at a time per process; imports queued in other worker processes
+# wait up to UPLOAD_LOCK_TIMEOUT for SQLite's write lock. Job state is kept in files under
+# uploads/jobs (see write_upload_job) so any worker can answer a status poll.
+_upload_executor = ThreadPoolExecutor(max_workers=1)
+
+# Last rendered db_info context: {'key': db_file_signature(), 'time': timestamp, 'context': {...}}
+_db_info_cache = {}
+
+# Table names for existing_table_required: {'key': db_file_signature(), 'names': frozenset}
+_table_names_cache = {}
 
 # Helper functions
-@contextmanager
-def get_db_connection():
-    """Context manager for database connections with automatic cleanup"""
-    conn = sqlite3.connect('maindatabase.db')
+def open_db_connection(readonly=False):
+    """Open and configure a new connection to maindatabase.db
+
+    readonly=True opens the file with mode=ro in autocommit mode, for pages that only read.
+    """
+    if readonly:
+        conn = sqlite3.connect('file:maindatabase.db?mode=ro', uri=True, isolation_level=None)
+    else:
+        conn = sqlite3.connect('maindatabase.db')
+        # journal_mode is stored in the database file, so switching once per process is enough
+        if not _db_static_info.get('wal'):
+            conn.execute('PRAGMA journal_mode = WAL')
+            _db_static_info['wal'] = True
+        conn.execute('PRAGMA synchronous = NORMAL')
     conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA cache_size = -65536')  # 64MiB
+    conn.execute('PRAGMA temp_store = MEMORY')
+    conn.execute('PRAGMA mmap_size = 268435456')  # 256MB
+    return conn
+
+@contextmanager
+def get_db_connection(readonly=False):
+    """Context manager for the request's database connection
+
+    Inside a request the connection is opened on first use, kept on flask.g and closed by
+    close_db_connections() at teardown. Outside one (e.g. worker threads) a private connection
+    is opened and closed around the block.
+    """
+    if has_app_context():
+        key = 'db_readonly' if readonly else 'db'
+        conn = g.get(key)
+        if conn is None:
+            conn = open_db_connection(readonly)
+            setattr(g, key, conn)
+        shared = True
+    else:
+        conn = open_db_connection(readonly)
+        shared = False
     try:
         yield conn
     except Exception:
         conn.rollback()
         raise
     finally:
-        conn.close()
-
-def admin_required(f):
-    @functools.wraps(f)
-    def decorated_function(*args, **kwargs):
-        if 'user_id' not in session or session.get('role') != 'admin':
-            flash('Admin access required', 'danger')
-            return redirect(url_for('login'))
-        return f(*args, **kwargs)
-    return decorated_function
+        if not shared:
+            conn.close()
+        elif conn.in_transaction:
+            # Same as closing: work a block left uncommitted is discarded, not carried into the next one
+            conn.rollback()
+
+@admin_bp.teardown_app_request
+def close_db_connections(exception):
+    for key in ('db', 'db_readonly'):
+        conn = g.pop(key, None)
+        if conn is not None:
+            if key == 'db':
+                # Let SQLite refresh planner statistics for tables this request's queries leaned on
+                # (writable connections only, it may run ANALYZE); best effort, a busy database
+                # just skips it this time
+                try:
+                    conn.execute('PRAGMA optimize')
+                except sqlite3.Error:
+                    pass
+            conn.close()
+
+@admin_bp.before_request
+def require_admin():
+    """Every /admin view is admin-only, so check once per request instead of per view"""
+    if session.get('role') != 'admin' or 'user_id' not in session:
+        flash('Admin access required', 'danger')
+        return redirect(url_for('login'))
 
 def validate_file_upload(file, allowed_extensions=None):
     """Validate uploaded file"""
@@ -54,13 +204,104 @@ def validate_file_upload(file, allowed_extensions=None):
     if not file or file.filename == '':
         return False, 'No file selected'
 
-    if not any(file.filename.lower().endswith(ext) for ext in allowed_extensions):
+    if not file.filename.lower().endswith(tuple(allowed_extensions)):
         return False, f'Please upload a file with extension: {", ".join(allowed_extensions)}'
 
     return True, None
 
+def iter_chunks(items, size=SQL_BATCH_SIZE):
+    """Yield lists of at most `size` items, e.g. to keep IN (...) lists under SQLite's variable limit"""
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def get_pagination_args():
+    """Read page/per_page query args, clamped to sane bounds"""
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', DEFAULT_PER_PAGE, type=int), 1), MAX_PER_PAGE)
+    return page, per_page
+
+def get_table_count(conn, table):
+    """Row count for a table, cached for COUNT_CACHE_TTL seconds"""
+    cached = _count_cache.get(table)
+    now = time.monotonic()
+    if cached and now - cached[0] < COUNT_CACHE_TTL:
+        return cached[1]
+
+    count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    _count_cache[table] = (now, count)
+    return count
+
+def db_file_signature(db_path='maindatabase.db'):
+    """(mtime, size) of the database file and its WAL; changes whenever a write lands"""
+    signature = []
+    for path in (db_path, db_path + '-wal'):
+        try:
+            st = os.stat(path)
+            signature.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+def invalidate_db_caches():
+    """Drop cached row counts, dashboard stats and db_info after a write that adds or removes rows"""
+    _count_cache.clear()
+    _dashboard_cache.clear()
+    _db_info_cache.clear()
+
+class _Echo:
+    """File-like sink for csv.writer: writerow() returns the formatted line instead of buffering it"""
+    def write(self, value):
+        return value
+
+def _count_tables(conn, tables):
+    """[(table, COUNT(*))] for up to 100 tables in one UNION ALL statement"""
+    sql = " UNION ALL ".join(
+        "SELECT ?, COUNT(*) FROM \"%s\"" % t.replace('"', '""') for t in tables
+    )
+    return conn.execute(sql, tables).fetchall()
+
+def _count_tables_readonly(tables):
+    with get_db_connection(readonly=True) as conn:
+        return _count_tables(conn, tables)
+
+def get_table_counts(conn, tables):
+    """Row counts for several tables, with stale entries refreshed by one UNION ALL query per 100 tables"""
+    now = time.monotonic()
+    stale = [t for t in tables
+             if t not in _count_cache or now - _count_cache[t][0] >= COUNT_CACHE_TTL]
+    # Keep well under SQLITE_LIMIT_COMPOUND_SELECT (500 by default)
+    chunks = list(iter_chunks(stale, 100))
+    if len(chunks) > 1:
+        # Scan the batches on separate read-only connections; WAL lets the readers run side by side
+        with ThreadPoolExecutor(max_workers=COUNT_WORKERS) as pool:
+            results = list(itertools.chain.from_iterable(pool.map(_count_tables_readonly, chunks)))
+    else:
+        results = _count_tables(conn, chunks[0]) if chunks else []
+    for table, count in results:
+        _count_cache[table] = (now, count)
+    return {t: _count_cache[t][1] for t in tables}
+
+def json_response(key, array_json, columns=None):
+    """Wrap a JSON array string produced by SQLite as {key: [...]} without re-parsing it
+
+    With `columns`, the array holds one positional row per record and the column names are sent
+    once alongside it as {"columns": [...], key: [[...], ...]}.
+    """
+    if columns is None:
+        return current_app.response_class('{"%s": %s}' % (key, array_json), mimetype='application/json')
+    return current_app.response_class('{"columns": %s, "%s": %s}' % (json.dumps(columns), key, array_json),
+                                      mimetype='application/json')
+
 def get_dashboard_stats():
-    """Get dashboard statistics in a single query"""
+    """Get dashboard statistics in a single query, cached for DASHBOARD_CACHE_TTL seconds"""
+    cached = _dashboard_cache.get('value')
+    if cached and time.monotonic() - _dashboard_cache['time'] < DASHBOARD_CACHE_TTL:
+        return cached
+
     with get_db_connection() as conn:
         c = conn.cursor()
 
@@ -84,32 +325,100 @@ def get_dashboard_stats():
         """)
         recent_activity = c.fetchall()
 
-        return dict(stats), recent_activity
+    _dashboard_cache.update(time=time.monotonic(), value=(dict(stats), recent_activity))
+    return _dashboard_cache['value']
+
+def iter_upload_rows(file):
+    """Return the header and a lazy row iterator for an uploaded CSV/Excel file"""
+    filename = file.filename.lower()
+
+    if filename.endswith('.csv'):
+        reader = csv.reader(io.TextIOWrapper(file.stream, encoding='utf-8-sig', newline=''))
+        headers = [h.strip() for h in next(reader, [])]
+        return headers, reader
+
+    if filename.endswith(('.xlsx', '.xls')):
+        # Prefer the native calamine reader; it handles both .xlsx and legacy .xls
+        try:
+            from python_calamine import CalamineWorkbook
+        except ImportError:
+            CalamineWorkbook = None
+
+        if CalamineWorkbook is not None:
+            sheet_rows = CalamineWorkbook.from_filelike(file).get_sheet_by_index(0).iter_rows()
+            headers = [str(h).strip() for h in next(sheet_rows, [])]
+
+            def rows():
+                for row in sheet_rows:
+                    # calamine reports every number as float; keep whole numbers (phones, counts) integral
+                    yield [int(v) if isinstance(v, float) and v.is_integer() else v for v in row]
+
+            return headers, rows()
+
+    if filename.endswith('.xlsx'):
+        wb = openpyxl.load_workbook(file, read_only=True, data_only=True)
+        ws = wb.active
+        header_row = next(ws.iter_rows(max_row=1, values_only=True), ())
+        headers = [str(h).strip() if h is not None else '' for h in header_row]
+
+        def rows():
+            try:
+                for row in ws.iter_rows(min_row=2, values_only=True):
+                    yield ['' if v is None else v for v in row]
+            finally:
+                wb.close()
+
+        return headers, rows()
+
+    # Legacy .xls workbooks are not supported by openpyxl
+    import pandas as pd
+    df = pd.read_excel(file, dtype=str).fillna('')
+    return [str(h).strip() for h in df.columns], df.itertuples(index=False, name=None)
 
-def process_csv_data(file, required_fields, optional_fields=None):
-    """Generic CSV processing function"""
-    if optional_fields is None:
-        optional_fields = []
+class UploadReadError(ValueError):
+    """An uploaded file could not be read past its first rows (bad encoding, malformed CSV)"""
+    pass
 
+def process_csv_data(file, required_fields, columns):
+    """Generic CSV processing function
+
+    Yields a tuple of the `columns` values, in that order, for each non-blank row; columns the
+    file does not have read as ''. Header names are resolved to positions once, not per row.
+
+    Rows are read lazily, so errors in the header or first row come back as the error message
+    while later ones raise UploadReadError from the row iterator; callers must catch it.
+    """
     try:
-        # Read CSV file
-        if file.filename.lower().endswith('.csv'):
-            df = pd.read_csv(file)
-        else:
-            df = pd.read_excel(file)
+        headers, rows = iter_upload_rows(file)
 
         # Validate required columns
-        if not all(field in df.columns for field in required_fields):
+        if not all(field in headers for field in required_fields):
             return None, f'File must contain columns: {", ".join(required_fields)}'
 
-        # Fill missing optional columns
-        for col in optional_fields:
-            if col not in df.columns:
-                df[col] = ''
-            else:
-                df[col] = df[col].fillna('')
+        index = {name: i for i, name in enumerate(headers)}
+        positions = [index.get(name) for name in columns]
+        width = len(headers)
 
-        return df.to_dict('records'), None
+        def records():
+            try:
+                for row in rows:
+                    # Skip blank lines/rows
+                    if all(v == '' for v in row):
+                        continue
+
+                    # Cells missing from the end of a short row read as ''
+                    if len(row) < width:
+                        row = list(row) + [''] * (width - len(row))
+                    yield tuple('' if i is None else row[i] for i in positions)
+            except (UnicodeDecodeError, csv.Error, ValueError) as e:
+                raise UploadReadError(str(e)) from e
+
+        # Stop here for header-only files rather than opening an import transaction for nothing
+        data = records()
+        first = next(data, None)
+        if first is None:
+            return None, 'File contains no data rows'
+        return itertools.chain((first,), data), None
 
     except Exception as e:
         return None, f'Error processing file: {str(e)}'
@@ -120,10 +429,8 @@ def bulk_delete_records(table, filter_field, filter_value, skip_conditions=None)
         skip_conditions = []
 
     with get_db_connection() as conn:
-        c = conn.cursor()
-
-        # Build query
-        query = f"SELECT id FROM {table} WHERE {filter_field} = ?"
+        # Delete by the criterion directly; no round-trip of matching ids through Python
+        query = f"DELETE FROM {table} WHERE {filter_field} = ?"
         params = [filter_value]
 
         # Add skip conditions
@@ -132,26 +439,21 @@ def bulk_delete_records(table, filter_field, filter_value, skip_conditions=None)
 
         # Don't delete current user if it's users table
         if table == 'users':
-            query += f" AND id != {session['user_id']}"
+            query += " AND id != ?"
+            params.append(session['user_id'])
 
-        c.execute(query, params)
-        record_ids = [row[0] for row in c.fetchall()]
+        deleted_count = conn.execute(query, params).rowcount
 
-        if not record_ids:
+        if not deleted_count:
             return 0, 'No records found matching the criteria'
 
-        # Delete records
-        placeholders = ','.join(['?'] * len(record_ids))
-        c.execute(f"DELETE FROM {table} WHERE id IN ({placeholders})", record_ids)
-
-        deleted_count = c.rowcount
         conn.commit()
+        invalidate_db_caches()
 
         return deleted_count, None
 
 # Admin dashboard
 @admin_bp.route('/')
-@admin_required
 def admin_dashboard():
     stats, recent_activity = get_dashboard_stats()
     return render_template('admin/dashboard.html',
@@ -162,17 +464,20 @@ def admin_dashboard():
 
 # User management
 @admin_bp.route('/users')
-@admin_required
 def user_list():
+    page, per_page = get_pagination_args()
+
     with get_db_connection() as conn:
-        c = conn.cursor()
-        c.execute("SELECT * FROM users ORDER BY username")
-        users = c.fetchall()
+        total_users = get_table_count(conn, 'users')
+        # Only the columns the list renders; never pulls password hashes into the page
+        users = conn.execute("SELECT id, username, full_name, role, region, state, lga FROM users "
+                             "ORDER BY username LIMIT ? OFFSET ?", (per_page, (page - 1) * per_page)).fetchall()
 
-    return render_template('admin/user_list.html', users=users)
+    return render_template('admin/user_list.html', users=users,
+                         page=page, per_page=per_page, total_count=total_users,
+                         total_pages=max(math.ceil(total_users / per_page), 1))
 
 @admin_bp.route('/users/new', methods=['GET', 'POST'])
-@admin_required
 def user_new():
     if request.method == 'POST':
         # Extract form data
@@ -212,6 +517,7 @@ def user_new():
             ''', tuple(form_data.values()))
 
             conn.commit()
+            invalidate_db_caches()
 
         flash('User created successfully', 'success')
         return redirect(url_for('admin.user_list'))
@@ -219,7 +525,6 @@ def user_new():
     return render_template('admin/user_form.html')
 
 @admin_bp.route('/users/edit/<int:user_id>', methods=['GET', 'POST'])
-@admin_required
 def user_edit(user_id):
     with get_db_connection() as conn:
         c = conn.cursor()
@@ -244,13 +549,19 @@ def user_edit(user_id):
                 c.execute('''
                 UPDATE users SET password = ?, full_name = ?, role = ?, region = ?, state = ?, lga = ?
                 WHERE id = ?
+                RETURNING id
                 ''', (password, full_name, role, region, state, lga, user_id))
             else:
                 c.execute('''
                 UPDATE users SET full_name = ?, role = ?, region = ?, state = ?, lga = ?
                 WHERE id = ?
+                RETURNING id
                 ''', (full_name, role, region, state, lga, user_id))
 
+            if c.fetchone() is None:
+                flash('User not found', 'danger')
+                return redirect(url_for('admin.user_list'))
+
             conn.commit()
             flash('User updated successfully', 'success')
             return redirect(url_for('admin.user_list'))
@@ -266,7 +577,6 @@ def user_edit(user_id):
     return render_template('admin/user_form.html', user=user)
 
 @admin_bp.route('/users/delete/<int:user_id>', methods=['POST'])
-@admin_required
 def user_delete(user_id):
     # Don't allow deleting self
     if user_id == session['user_id']:
@@ -287,56 +597,63 @@ def user_delete(user_id):
         # Delete user
         c.execute("DELETE FROM users WHERE id = ?", (user_id,))
         conn.commit()
+        invalidate_db_caches()
 
     flash('User deleted successfully', 'success')
     return redirect(url_for('admin.user_list'))
 
 @admin_bp.route('/users/import', methods=['GET', 'POST'])
-@admin_required
 def user_import():
     if request.method == 'POST':
         file = request.files.get('csv_file')
-        is_valid, error_msg = validate_file_upload(file, ['.csv'])
+        is_valid, error_msg = validate_file_upload(file, ('.csv',))
 
         if not is_valid:
             flash(error_msg, 'danger')
             return redirect(request.url)
 
-        data, error_msg = process_csv_data(file, REQUIRED_USER_FIELDS, OPTIONAL_USER_FIELDS)
+        data, error_msg = process_csv_data(file, REQUIRED_USER_FIELDS, USER_IMPORT_COLUMNS)
         if error_msg:
             flash(error_msg, 'danger')
             return redirect(request.url)
 
+        # Rows are validated as executemany pulls them, so the file is never held in memory;
+        # uniqueness is enforced by the UNIQUE(username) constraint
+        counts = {'valid': 0, 'errors': 0}
+        is_valid_role = VALID_ROLES.__contains__
+        role_index = USER_IMPORT_COLUMNS.index('role')
+        required = [USER_IMPORT_COLUMNS.index(field) for field in REQUIRED_USER_FIELDS]
+
+        def users():
+            for user in data:
+                if not is_valid_role(user[role_index]) or not all(user[i] for i in required):
+                    counts['errors'] += 1
+                    continue
+                counts['valid'] += 1
+                yield user
+
         with get_db_connection() as conn:
             c = conn.cursor()
-            success_count = error_count = 0
 
-            for row in data:
-                try:
-                    # Validate role
-                    if row['role'] not in VALID_ROLES:
-                        error_count += 1
-                        continue
+            # Take the write lock up front so the whole import is one transaction;
+            # get_db_connection rolls it back if anything below raises
+            c.execute("BEGIN IMMEDIATE")
 
-                    # Check if username exists
-                    c.execute("SELECT id FROM users WHERE username = ?", (row['username'],))
-                    if c.fetchone():
-                        error_count += 1
-                        continue
-
-                    # Insert user
-                    c.execute('''
-                    INSERT INTO users (username, password, full_name, role, region, state, lga)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ''', (row['username'], row['password'], row['full_name'],
-                         row['role'], row['region'], row.get('state', ''), row.get('lga', '')))
-                    success_count += 1
-
-                except Exception as e:
-                    print(f"Error inserting user: {str(e)}")
-                    error_count += 1
+            # Existing usernames are skipped by the engine instead of a SELECT per row
+            try:
+                c.executemany('''
+                INSERT OR IGNORE INTO users (username, password, full_name, role, region, state, lga)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', users())
+                success_count = c.rowcount
+                error_count = counts['errors'] + counts['valid'] - success_count
 
-            conn.commit()
+                conn.commit()
+            except UploadReadError as e:
+                # The file broke partway through; get_db_connection discards the rows inserted so far
+                flash(f'Error processing file: {str(e)}', 'danger')
+                return redirect(request.url)
+            invalidate_db_caches()
 
         flash(f'Imported {success_count} users successfully, {error_count} errors', 'success')
         return redirect(url_for('admin.user_list'))
@@ -345,41 +662,37 @@ def user_import():
 
 # Bulk User Operations
 @admin_bp.route('/users/bulk_manage')
-@admin_required
 def user_bulk_manage():
     return render_template('admin/user_bulk_manage.html')
 
 @admin_bp.route('/users/preview')
-@admin_required
 def user_preview():
     delete_by = request.args.get('delete_by')
     value = request.args.get('value')
 
-    if not delete_by or not value:
+    # delete_by is interpolated as a column name, so it must be one of the known filters
+    if delete_by not in USER_FILTER_FIELDS or not value:
         return jsonify({'users': []})
 
     with get_db_connection() as conn:
-        c = conn.cursor()
-
-        # Build query based on filter
+        # Let SQLite build the JSON in one row: a positional array per user, keys sent once
         query = '''
-        SELECT u.*, COUNT(e.id) as executions
+        SELECT COALESCE(json_group_array(json_array(
+            u.id, u.username, u.full_name, u.role, u.region, u.state, u.lga,
+            (SELECT COUNT(*) FROM executions e WHERE e.agent_id = u.id)
+        )), '[]')
         FROM users u
-        LEFT JOIN executions e ON u.id = e.agent_id
         WHERE u.{} = ?
-        GROUP BY u.id
         '''.format(delete_by)
 
-        c.execute(query, (value,))
-        users = [dict(row) for row in c.fetchall()]
+        users_json = conn.execute(query, (value,)).fetchone()[0]
 
-    return jsonify({'users': users})
+    return json_response('users', users_json, USER_PREVIEW_COLUMNS)
 
 @admin_bp.route('/users/bulk_delete', methods=['POST'])
-@admin_required
 def user_bulk_delete():
     delete_by = request.form.get('delete_by')
-    value = request.form.get(delete_by) if delete_by in ['region', 'state', 'lga'] else None
+    value = request.form.get(delete_by) if delete_by in USER_FILTER_FIELDS else None
 
     if not delete_by or not value:
         flash('Invalid criteria or no value specified', 'danger')
@@ -388,7 +701,7 @@ def user_bulk_delete():
     # Build skip conditions
     skip_conditions = []
     if 'skip_with_executions' in request.form:
-        skip_conditions.append("id NOT IN (SELECT DISTINCT agent_id FROM executions)")
+        skip_conditions.append("NOT EXISTS (SELECT 1 FROM executions e WHERE e.agent_id = users.id)")
     if 'skip_admins' in request.form:
         skip_conditions.append("role != 'admin'")
 
@@ -405,17 +718,20 @@ def user_bulk_delete():
 
 # Outlet management
 @admin_bp.route('/outlets')
-@admin_required
 def outlet_list():
+    page, per_page = get_pagination_args()
+
     with get_db_connection() as conn:
-        c = conn.cursor()
-        c.execute("SELECT * FROM outlets ORDER BY region, state, local_govt, outlet_name")
-        outlets = c.fetchall()
+        total_outlets = get_table_count(conn, 'outlets')
+        outlets = conn.execute("SELECT id, urn, outlet_name, customer_name, outlet_type, region, state, local_govt FROM outlets "
+                               "ORDER BY region, state, local_govt, outlet_name LIMIT ? OFFSET ?",
+                               (per_page, (page - 1) * per_page)).fetchall()
 
-    return render_template('admin/outlet_list.html', outlets=outlets)
+    return render_template('admin/outlet_list.html', outlets=outlets,
+                         page=page, per_page=per_page, total_count=total_outlets,
+                         total_pages=max(math.ceil(total_outlets / per_page), 1))
 
 @admin_bp.route('/outlets/new', methods=['GET', 'POST'])
-@admin_required
 def outlet_new():
     if request.method == 'POST':
         # Extract form data
@@ -452,6 +768,7 @@ def outlet_new():
             ''', tuple(form_data.values()))
 
             conn.commit()
+            invalidate_db_caches()
 
         flash('Outlet created successfully', 'success')
         return redirect(url_for('admin.outlet_list'))
@@ -459,7 +776,6 @@ def outlet_new():
     return render_template('admin/outlet_form.html')
 
 @admin_bp.route('/outlets/edit/<int:outlet_id>', methods=['GET', 'POST'])
-@admin_required
 def outlet_edit(outlet_id):
     with get_db_connection() as conn:
         c = conn.cursor()
@@ -484,21 +800,23 @@ def outlet_edit(outlet_id):
                 outlet = c.fetchone()
                 return render_template('admin/outlet_form.html', outlet=outlet)
 
-            # Check if URN exists on another outlet
-            c.execute("SELECT id FROM outlets WHERE urn = ? AND id != ?", (form_data['urn'], outlet_id))
-            if c.fetchone():
-                flash('URN already exists on another outlet', 'danger')
-                c.execute("SELECT * FROM outlets WHERE id = ?", (outlet_id,))
-                outlet = c.fetchone()
-                return render_template('admin/outlet_form.html', outlet=outlet)
-
-            # Update outlet
+            # Update outlet unless the URN is taken by another outlet, in one statement
             c.execute('''
             UPDATE outlets
             SET urn = ?, outlet_name = ?, customer_name = ?, address = ?, phone = ?, outlet_type = ?,
             local_govt = ?, state = ?, region = ?
-            WHERE id = ?
-            ''', (*form_data.values(), outlet_id))
+            WHERE id = ? AND NOT EXISTS (SELECT 1 FROM outlets WHERE urn = ? AND id != ?)
+            RETURNING id
+            ''', (*form_data.values(), outlet_id, form_data['urn'], outlet_id))
+
+            if c.fetchone() is None:
+                c.execute("SELECT * FROM outlets WHERE id = ?", (outlet_id,))
+                outlet = c.fetchone()
+                if not outlet:
+                    flash('Outlet not found', 'danger')
+                    return redirect(url_for('admin.outlet_list'))
+                flash('URN already exists on another outlet', 'danger')
+                return render_template('admin/outlet_form.html', outlet=outlet)
 
             conn.commit()
             flash('Outlet updated successfully', 'success')
@@ -515,7 +833,6 @@ def outlet_edit(outlet_id):
     return render_template('admin/outlet_form.html', outlet=outlet)
 
 @admin_bp.route('/outlets/delete/<int:outlet_id>', methods=['POST'])
-@admin_required
 def outlet_delete(outlet_id):
     with get_db_connection() as conn:
         c = conn.cursor()
@@ -531,12 +848,12 @@ def outlet_delete(outlet_id):
         # Delete outlet
         c.execute("DELETE FROM outlets WHERE id = ?", (outlet_id,))
         conn.commit()
+        invalidate_db_caches()
 
     flash('Outlet deleted successfully', 'success')
     return redirect(url_for('admin.outlet_list'))
 
 @admin_bp.route('/outlets/import', methods=['GET', 'POST'])
-@admin_required
 def outlet_import():
     if request.method == 'POST':
         file = request.files.get('csv_file')
@@ -546,96 +863,105 @@ def outlet_import():
             flash(error_msg, 'danger')
             return redirect(request.url)
 
-        data, error_msg = process_csv_data(file, REQUIRED_OUTLET_FIELDS, OPTIONAL_OUTLET_FIELDS)
+        data, error_msg = process_csv_data(file, REQUIRED_OUTLET_FIELDS, OUTLET_IMPORT_COLUMNS)
         if error_msg:
             flash(error_msg, 'danger')
             return redirect(request.url)
 
+        # Rows are validated as executemany pulls them, so the file is never held in memory
+        counts = {'errors': 0}
+
+        required = [OUTLET_IMPORT_COLUMNS.index(field) for field in REQUIRED_OUTLET_FIELDS]
+
+        def outlets():
+            for outlet in data:
+                if not all(outlet[i] for i in required):
+                    counts['errors'] += 1
+                    continue
+                yield outlet
+
         with get_db_connection() as conn:
             c = conn.cursor()
-            success_count = update_count = error_count = 0
 
-            for row in data:
-                try:
-                    # Check if outlet with URN exists
-                    c.execute("SELECT id FROM outlets WHERE urn = ?", (row['urn'],))
-                    existing = c.fetchone()
-
-                    if existing:
-                        # Update existing outlet
-                        c.execute('''
-                        UPDATE outlets
-                        SET outlet_name = ?, customer_name = ?, address = ?, phone = ?, outlet_type = ?,
-                        local_govt = ?, state = ?, region = ?
-                        WHERE urn = ?
-                        ''', (row['outlet_name'], row.get('customer_name', ''), row.get('address', ''),
-                             row.get('phone', ''), row.get('outlet_type', ''), row.get('local_govt', ''),
-                             row.get('state', ''), row['region'], row['urn']))
-                        update_count += 1
-                    else:
-                        # Insert new outlet
-                        c.execute('''
-                        INSERT INTO outlets (urn, outlet_name, customer_name, address, phone, outlet_type, local_govt, state, region)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        ''', (row['urn'], row['outlet_name'], row.get('customer_name', ''),
-                             row.get('address', ''), row.get('phone', ''), row.get('outlet_type', ''),
-                             row.get('local_govt', ''), row.get('state', ''), row['region']))
-                        success_count += 1
-
-                except Exception as e:
-                    print(f"Error processing row: {str(e)}")
-                    error_count += 1
+            # One write transaction for the whole import; it also keeps the
+            # before/after counts consistent with concurrent writers
+            c.execute("BEGIN IMMEDIATE")
 
-            conn.commit()
+            c.execute("SELECT COUNT(*) FROM outlets")
+            count_before = c.fetchone()[0]
+
+            # Insert new outlets and update existing ones (matched on URN) in one statement
+            try:
+                c.executemany('''
+                INSERT INTO outlets (urn, outlet_name, customer_name, address, phone, outlet_type, local_govt, state, region)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(urn) DO UPDATE SET
+                    outlet_name = excluded.outlet_name, customer_name = excluded.customer_name,
+                    address = excluded.address, phone = excluded.phone, outlet_type = excluded.outlet_type,
+                    local_govt = excluded.local_govt, state = excluded.state, region = excluded.region
+                ''', outlets())
+                affected_count = c.rowcount
+                error_count = counts['errors']
+
+                c.execute("SELECT COUNT(*) FROM outlets")
+                success_count = c.fetchone()[0] - count_before
+                update_count = affected_count - success_count
+
+                conn.commit()
+            except UploadReadError as e:
+                # The file broke partway through; get_db_connection discards the rows inserted so far
+                flash(f'Error processing file: {str(e)}', 'danger')
+                return redirect(request.url)
+            invalidate_db_caches()
 
         flash(f'Imported {success_count} new outlets, updated {update_count}, {error_count} errors', 'success')
         return redirect(url_for('admin.outlet_list'))
 
-    # Provide a sample CSV template
-    sample_data = [
-        ['urn', 'outlet_name', 'customer_name', 'address', 'phone', 'outlet_type', 'local_govt', 'state', 'region'],
-        ['DCP/22/SW/ED/1000009', 'SAMPLE OUTLET', 'JOHN DOE', '123 SAMPLE STREET', '08012345678', 'Shop', 'EGOR', 'EDO', 'SW']
-    ]
+    return render_template('admin/outlet_import.html', sample_data=SAMPLE_OUTLET_ROWS[:2])
 
-    return render_template('admin/outlet_import.html', sample_data=sample_data)
+@admin_bp.route('/outlets/import/template.csv')
+def outlet_import_template():
+    response = current_app.response_class(SAMPLE_OUTLET_CSV, mimetype='text/csv',
+                                          headers={'Content-Disposition': 'attachment; filename=sample_outlets.csv'})
+    # The file only changes with a deploy; let the browser keep it and revalidate with the ETag
+    response.set_etag(SAMPLE_OUTLET_ETAG)
+    response.cache_control.private = True
+    response.cache_control.max_age = 86400
+    return response.make_conditional(request)
 
 # Bulk Outlet Operations
 @admin_bp.route('/outlets/bulk_manage')
-@admin_required
 def outlet_bulk_manage():
     return render_template('admin/outlet_bulk_manage.html')
 
 @admin_bp.route('/outlets/preview')
-@admin_required
 def outlet_preview():
     delete_by = request.args.get('delete_by')
     value = request.args.get('value')
 
-    if not delete_by or not value:
+    # delete_by is interpolated as a column name, so it must be one of the known filters
+    if delete_by not in OUTLET_FILTER_FIELDS or not value:
         return jsonify({'outlets': []})
 
     with get_db_connection() as conn:
-        c = conn.cursor()
-
-        # Build query based on filter
+        # Let SQLite build the JSON in one row: a positional array per outlet, keys sent once
         query = '''
-        SELECT o.*, COUNT(e.id) as executions
+        SELECT COALESCE(json_group_array(json_array(
+            o.id, o.urn, o.outlet_name, o.customer_name, o.outlet_type, o.region, o.state, o.local_govt,
+            (SELECT COUNT(*) FROM executions e WHERE e.outlet_id = o.id)
+        )), '[]')
         FROM outlets o
-        LEFT JOIN executions e ON o.id = e.outlet_id
         WHERE o.{} = ?
-        GROUP BY o.id
         '''.format(delete_by)
 
-        c.execute(query, (value,))
-        outlets = [dict(row) for row in c.fetchall()]
+        outlets_json = conn.execute(query, (value,)).fetchone()[0]
 
-    return jsonify({'outlets': outlets})
+    return json_response('outlets', outlets_json, OUTLET_PREVIEW_COLUMNS)
 
 @admin_bp.route('/outlets/bulk_delete', methods=['POST'])
-@admin_required
 def outlet_bulk_delete():
     delete_by = request.form.get('delete_by')
-    value = request.form.get(delete_by) if delete_by in ['region', 'state', 'local_govt'] else None
+    value = request.form.get(delete_by) if delete_by in OUTLET_FILTER_FIELDS else None
 
     if not delete_by or not value:
         flash('Invalid criteria or no value specified', 'danger')
@@ -644,7 +970,7 @@ def outlet_bulk_delete():
     # Build skip conditions
     skip_conditions = []
     if 'skip_with_executions' in request.form:
-        skip_conditions.append("id NOT IN (SELECT DISTINCT outlet_id FROM executions)")
+        skip_conditions.append("NOT EXISTS (SELECT 1 FROM executions e WHERE e.outlet_id = outlets.id)")
 
     try:
         deleted_count, error_msg = bulk_delete_records('outlets', delete_by, value, skip_conditions)
@@ -659,7 +985,6 @@ def outlet_bulk_delete():
 
 # Profile management routes
 @admin_bp.route('/profile')
-@admin_required
 def profile_settings():
     """Display profile settings page"""
     from pykes.models import get_profile
@@ -684,7 +1009,6 @@ def profile_settings():
     return render_template('admin/profile_settings.html', profile=profile)
 
 @admin_bp.route('/profile/update', methods=['POST'])
-@admin_required
 def profile_update():
     """Update profile settings"""
     from pykes.models import update_profile
@@ -735,48 +1059,68 @@ def profile_update():
 
 # Execution Management
 @admin_bp.route('/executions')
-@admin_required
 def execution_list():
-    with get_db_connection() as conn:
-        c = conn.cursor()
-        c.execute('''
-        SELECT e.id, e.execution_date, o.outlet_name, o.region, o.state, u.full_name as agent_name, e.status
-        FROM executions e
-        JOIN outlets o ON e.outlet_id = o.id
-        JOIN users u ON e.agent_id = u.id
-        ORDER BY e.execution_date DESC
-        ''')
-        executions = c.fetchall()
+    _, per_page = get_pagination_args()
+
+    # Keyset pagination: continue after the last (execution_date, id) of the previous page
+    before_date = request.args.get('before', '', type=str)
+    before_id = request.args.get('before_id', 0, type=int)
+
+    query = '''
+    SELECT e.id, e.execution_date, o.outlet_name, o.region, o.state, u.full_name as agent_name, e.status
+    FROM executions e
+    JOIN outlets o ON e.outlet_id = o.id
+    JOIN users u ON e.agent_id = u.id
+    '''
+    params = []
+    if before_date and before_id:
+        query += " WHERE (e.execution_date, e.id) < (?, ?)"
+        params.extend([before_date, before_id])
+    query += " ORDER BY e.execution_date DESC, e.id DESC LIMIT ?"
+    params.append(per_page + 1)
 
-    return render_template('admin/execution_list.html', executions=executions)
+    with get_db_connection() as conn:
+        total_executions = get_table_count(conn, 'executions')
+        executions = conn.execute(query, params).fetchall()
+
+    # The extra row only tells us whether a next page exists
+    next_cursor = None
+    if len(executions) > per_page:
+        executions = executions[:per_page]
+        last = executions[-1]
+        next_cursor = {'before': last['execution_date'], 'before_id': last['id']}
+
+    return render_template('admin/execution_list.html', executions=executions,
+                         per_page=per_page, total_count=total_executions,
+                         next_cursor=next_cursor, is_first_page=not (before_date and before_id))
+
+def remove_execution_images(executions):
+    """Delete the (before_image, after_image) files of deleted executions from static/uploads"""
+    upload_folder = os.path.join(current_app.static_folder, 'uploads')
+    for images in executions:
+        for image_name in images:
+            if not image_name:
+                continue
+            try:
+                os.unlink(os.path.join(upload_folder, image_name))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                current_app.logger.warning(f"Could not delete image {image_name}: {e}")
 
 @admin_bp.route('/executions/delete/<int:execution_id>', methods=['POST'])
-@admin_required
 def execution_delete(execution_id):
     with get_db_connection() as conn:
-        c = conn.cursor()
-
-        # Get execution details to delete images
-        c.execute("SELECT before_image, after_image FROM executions WHERE id = ?", (execution_id,))
-        execution = c.fetchone()
+        # Delete the record and get its image names back in one statement
+        execution = conn.execute("DELETE FROM executions WHERE id = ? RETURNING before_image, after_image",
+                                 (execution_id,)).fetchone()
 
         if execution:
-            # Delete execution record
-            c.execute("DELETE FROM executions WHERE id = ?", (execution_id,))
             conn.commit()
+            invalidate_db_caches()
 
             # Delete associated images
-            upload_folder = os.path.join(current_app.static_folder, 'uploads')
-
-            for image_field in ['before_image', 'after_image']:
-                image_name = execution[image_field]
-                if image_name:
-                    image_path = os.path.join(upload_folder, image_name)
-                    if os.path.exists(image_path):
-                        try:
-                            os.remove(image_path)
-                        except OSError:
-                            pass  # Ignore file deletion errors
+            remove_execution_images([execution])
 
             flash('Execution deleted successfully', 'success')
         else:
@@ -784,10 +1128,445 @@ def execution_delete(execution_id):
 
     return redirect(url_for('admin.execution_list'))
 
+@admin_bp.route('/executions/bulk_delete', methods=['POST'])
+def execution_bulk_delete():
+    execution_ids = request.form.getlist('execution_ids', type=int)
+    if not execution_ids:
+        flash('No executions selected', 'warning')
+        return redirect(url_for('admin.execution_list'))
+
+    with get_db_connection() as conn:
+        c = conn.cursor()
+
+        # One DELETE per batch of ids, collecting image names from RETURNING
+        deleted = []
+        for chunk in iter_chunks(execution_ids):
+            placeholders = ','.join(['?'] * len(chunk))
+            c.execute(f"DELETE FROM executions WHERE id IN ({placeholders}) RETURNING before_image, after_image", chunk)
+            deleted.extend(c.fetchall())
+
+        conn.commit()
+        invalidate_db_caches()
+
+    remove_execution_images(deleted)
+
+    flash(f'Successfully deleted {len(deleted)} executions', 'success')
+    return redirect(url_for('admin.execution_list'))
+
+class UploadReport:
+    """Report file for an upload, written line by line and moved into place on success"""
+
+    def __init__(self, path, header=''):
+        self.path = path
+        self.header = header
+        self.count = 0
+        self._file = None
+
+    def write(self, line):
+        if self._file is None:
+            self._file = open(self.path + '.tmp', 'w', encoding='utf-8')
+            self._file.write(self.header)
+        self._file.write(line + '\n')
+        self.count += 1
+
+    def close(self, publish=True):
+        """Close the report; publish replaces the previous report, otherwise it is discarded"""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        if publish:
+            os.replace(self.path + '.tmp', self.path)
+        else:
+            os.remove(self.path + '.tmp')
+
+def process_execution_chunk(chunk, mapped_columns, cursor, state):
+    """Clean, de-duplicate and bulk insert one chunk of an execution upload"""
+    import pandas as pd
+
+    # Select, fill and stringify all mapped columns in one DataFrame pass, keyed by standard name
+    source = chunk[list(mapped_columns.values())].fillna('').astype(str)
+    source.columns = list(mapped_columns)
+
+    def clean_column(std_col, default=''):
+        if std_col not in source:
+            return pd.Series(default, index=chunk.index, dtype=object)
+        return source[std_col].str.strip()
+
+    execution_data = pd.DataFrame({
+        'urn': clean_column('URN'),
+        'outlet_name': clean_column('Retail Point Name'),
+        'customer_name': clean_column('Customer Name'),
+        'address': clean_column('Address'),
+        'phone': clean_column('Phone'),
+        'outlet_type': clean_column('Outlet Type', 'Shop'),
+        'lga': clean_column('LGA'),
+        'state': clean_column('State'),
+        'region': clean_column('Region', 'SW').replace('', 'SW'),  # Default to SW if not provided
+        'date': clean_column('Date'),
+        'status': clean_column('Status', 'Completed'),
+        'notes': clean_column('Notes'),
+    })
+
+    # Parse execution dates with one vectorized pass per accepted format; unparseable -> now
+    parsed_dates = pd.Series(pd.NaT, index=chunk.index, dtype='datetime64[ns]')
+    for date_format in EXECUTION_DATE_FORMATS:
+        parsed_dates = parsed_dates.fillna(pd.to_datetime(execution_data['date'], format=date_format, errors='coerce'))
+    execution_data['execution_date'] = parsed_dates.fillna(pd.Timestamp.now()).dt.strftime('%Y-%m-%d %H:%M:%S')
+
+    # Parse products availability
+    products = pd.DataFrame({
+        product: clean_column(product).str.lower().isin(PRODUCT_TRUE_VALUES) for product in PRODUCT_COLUMNS
+    })
+    execution_data['products_available'] = [PRODUCT_FLAGS_JSON[flags] for flags in products.itertuples(index=False, name=None)]
+
+    # Look up outlets for URNs not already resolved by an earlier chunk
+    outlet_by_urn = state['outlet_by_urn']
+    unknown_urns = set(execution_data['urn']) - outlet_by_urn.keys()
+    unknown_urns.discard('')
+    for urn_batch in iter_chunks(unknown_urns):
+        cursor.execute(f"SELECT urn, id FROM outlets WHERE urn IN ({','.join('?' * len(urn_batch))})", urn_batch)
+        outlet_by_urn.update(cursor.fetchall())
+
+    recent_urns = state['recent_urns']
+    recent_names = state['recent_names']
+    errors = state['errors']
+    log = current_app.logger
+    log_rows = log.isEnabledFor(logging.DEBUG)
+    pending_outlets = {}
+    executions_to_insert = []
+    insert_execution = '''
+        INSERT INTO executions (
+            outlet_id, agent_id, execution_date,
+            status, notes, products_available
+        ) VALUES (?, ?, ?, ?, ?, ?)
+    '''
+
+    def insert_outlets(outlets):
+        """Insert outlet rows with one multi-row INSERT and return {urn: id} for them"""
+        # A batch holds at most SQL_BATCH_SIZE outlets, which keeps it well under SQLite's parameter limit
+        values = ', '.join(['(?, ?, ?, ?, ?, ?, ?, ?, ?)'] * len(outlets))
+        cursor.execute(f'''
+            INSERT INTO outlets (
+                urn, outlet_name, customer_name, address, phone,
+                outlet_type, local_govt, state, region
+            ) VALUES {values}
+            RETURNING urn, id
+        ''', list(itertools.chain.from_iterable(outlets)))
+        return dict(cursor.fetchall())
+
+    def flush_batch():
+        """Insert queued outlets, then queued executions, and record which rows made it
+
+        A row that breaks a schema constraint (NOT NULL, CHECK, ...) fails the batch statement, so
+        the batch is then undone and written again one statement per row: only the offending rows
+        are reported and skipped. Each statement is atomic, so a rejected row leaves nothing behind.
+        """
+        if not executions_to_insert:
+            return
+
+        row_errors = {}
+        cursor.execute('SAVEPOINT upload_batch')
+        try:
+            new_ids = insert_outlets([values for _, values in pending_outlets.values()]) if pending_outlets else {}
+            cursor.executemany(insert_execution, [
+                (new_ids.get(urn) or outlet_by_urn[urn], *values) for _, urn, *values in executions_to_insert
+            ])
+        except sqlite3.IntegrityError:
+            cursor.execute('ROLLBACK TO upload_batch')
+            new_ids = {}
+            outlet_errors = {}
+            for urn, (_, values) in pending_outlets.items():
+                try:
+                    new_ids.update(insert_outlets([values]))
+                except sqlite3.IntegrityError as e:
+                    outlet_errors[urn] = f"Failed to create outlet for URN '{urn}': {e}"
+            for row_number, urn, *values in executions_to_insert:
+                if urn in outlet_errors:
+                    row_errors[row_number] = outlet_errors[urn]
+                    continue
+                try:
+                    cursor.execute(insert_execution, (new_ids.get(urn) or outlet_by_urn[urn], *values))
+                except sqlite3.IntegrityError as e:
+                    row_errors[row_number] = str(e)
+        cursor.execute('RELEASE upload_batch')
+
+        outlet_by_urn.update(new_ids)
+        for urn, (row_number, values) in pending_outlets.items():
+            if urn in new_ids:
+                state['outlets_created'] += 1
+                state['new_outlets'].write(f"Row {row_number}: URN={urn}, Name={values[1]}, Region={values[8]}")
+                if log_rows:
+                    log.debug(f"Created new outlet: URN={urn}, Name={values[1]}")
+
+        for row_number, urn, *_ in executions_to_insert:
+            if row_number in row_errors:
+                error_msg = f"Row {row_number}: {row_errors[row_number]}"
+                errors.write(error_msg)
+                log.error(error_msg)
+                continue
+            state['imported'] += 1
+            if log_rows:
+                log.debug(f"Imported execution for URN {urn} (row {row_number})")
+
+        pending_outlets.clear()
+        executions_to_insert.clear()
+
+    for row in execution_data.itertuples():
+        row_number = row.Index + 1
+        try:
+            urn = row.urn
+            outlet_name = row.outlet_name
+
+            if not urn or not outlet_name:
+                errors.write(f"Row {row_number}: Missing required data - URN: '{urn}', Outlet Name: '{outlet_name}'")
+                continue
+
+            # Check for existing execution in last 7 days (skip duplicate check for new outlets)
+            if 'new' not in urn.lower():
+                if urn in recent_urns or outlet_name in recent_names:
+                    state['duplicates'].write(
+                        f"Row {row_number}: Duplicate entry - URN '{urn}' or outlet name '{outlet_name}' has an execution in the last 7 days"
+                    )
+                    state['skipped'] += 1
+                    continue
+
+            # Queue a new outlet the first time an unknown URN is seen; counts and report
+            # lines are recorded when the batch is flushed and the outlet actually exists
+            if urn not in outlet_by_urn and urn not in pending_outlets:
+                pending_outlets[urn] = (row_number, (
+                    urn, outlet_name, row.customer_name, row.address, row.phone,
+                    row.outlet_type, row.lga, row.state, row.region
+                ))
+
+            # Queue execution; the outlet id is resolved when the batch is flushed
+            executions_to_insert.append((
+                row_number, urn, state['agent_id'], row.execution_date,
+                row.status, row.notes, row.products_available
+            ))
+
+            if row.execution_date >= state['seven_days_ago']:
+                recent_urns.add(urn)
+                recent_names.add(outlet_name)
+
+        except Exception as e:
+            error_msg = f"Row {row_number}: {str(e)}"
+            errors.write(error_msg)
+            log.error(error_msg)
+
+        # Write each batch as soon as it fills so rows go straight from parsing to SQL
+        if len(executions_to_insert) >= SQL_BATCH_SIZE:
+            flush_batch()
+
+    flush_batch()
+
+def import_execution_file(file):
+    """Import an execution CSV/Excel file with automatic outlet creation
+
+    Returns the outcome as a list of (category, message) pairs for the caller to show.
+    """
+    import pandas as pd
+
+    # Read the header now; data rows are pulled lazily in chunks below
+    headers, rows = iter_upload_rows(file)
+
+    current_app.logger.info(f"File columns: {headers}")
+
+    # Map columns dynamically; the first header matching a standard column wins
+    mapped_columns = {}
+    for col in headers:
+        standard_col = EXECUTION_COLUMN_ALIASES.get(canonical_column(col))
+        if standard_col and standard_col not in mapped_columns:
+            mapped_columns[standard_col] = col
+
+    # Validate minimal required columns
+    required_columns = ['URN', 'Retail Point Name']
+    missing_cols = [col for col in required_columns if col not in mapped_columns]
+    if missing_cols:
+        return [('danger', f"Missing required columns: {', '.join(missing_cols)}. Available columns: {', '.join(headers)}")]
+
+    # Create uploads directory with Windows-compatible path
+    uploads_dir = os.path.join(os.getcwd(), 'uploads')
+    os.makedirs(uploads_dir, exist_ok=True)
+
+    # Per-row report lines are streamed to these files instead of kept in memory
+    duplicates = UploadReport(os.path.join(uploads_dir, 'duplicates.txt'))
+    new_outlets = UploadReport(os.path.join(uploads_dir, 'new_outlets.txt'), 'New outlets created:\n')
+    errors = UploadReport(os.path.join(uploads_dir, 'import_errors.txt'), 'Import errors:\n')
+
+    state = {
+        'imported': 0,
+        'skipped': 0,
+        'outlets_created': 0,
+        'errors': errors,
+        'duplicates': duplicates,
+        'new_outlets': new_outlets,
+        'outlet_by_urn': {},
+        'recent_urns': set(),
+        'recent_names': set(),
+    }
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+
+            # Room for the outlet/execution indexes the import keeps hitting; the connection
+            # belongs to this upload job and is closed when the job ends
+            cursor.execute('PRAGMA cache_size = -262144')  # 256MiB
+
+            # Single write transaction for the whole file; get_db_connection
+            # rolls it back if anything escapes the per-row handling
+            cursor.execute('BEGIN IMMEDIATE')
+
+            # Outlets visited in the last 7 days, matched on URN or name
+            state['seven_days_ago'] = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d %H:%M:%S')
+            cursor.execute('''
+                SELECT DISTINCT o.urn, o.outlet_name FROM executions e
+                JOIN outlets o ON e.outlet_id = o.id
+                WHERE e.execution_date >= ?
+            ''', (state['seven_days_ago'],))
+            for recent_urn, recent_name in cursor.fetchall():
+                state['recent_urns'].add(recent_urn)
+                state['recent_names'].add(recent_name)
+
+            # Get agent once (prefer an active admin, fallback to any active user)
+            agent = (cursor.execute("SELECT id FROM users WHERE role = 'admin' AND is_active = 1 LIMIT 1").fetchone()
+                     or cursor.execute("SELECT id FROM users WHERE is_active = 1 LIMIT 1").fetchone())
+            if not agent:
+                raise ValueError("No active user found to assign as agent")
+            state['agent_id'] = agent[0]
+
+            # Process the file in bounded chunks so memory doesn't grow with file size
+            width = len(headers)
+            offset = 0
+            deferred_indexes = []
+            for batch in iter_chunks(rows, UPLOAD_CHUNK_SIZE):
+                # Large file (at least one full chunk): drop the executions indexes and
+                # rebuild each once at the end instead of updating them on every insert
+                if offset == 0 and len(batch) >= UPLOAD_CHUNK_SIZE:
+                    cursor.execute(
+                        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'executions' AND sql IS NOT NULL"
+                    )
+                    deferred_indexes = cursor.fetchall()
+                    for index_name, _ in deferred_indexes:
+                        cursor.execute(f'DROP INDEX "{index_name}"')
+
+                # Pad/trim ragged rows so they line up with the header
+                batch = [(list(row) + [''] * width)[:width] for row in batch]
+                chunk = pd.DataFrame(batch, columns=headers, index=range(offset, offset + len(batch)))
+                offset += len(batch)
+                process_execution_chunk(chunk, mapped_columns, cursor, state)
+
+            # Recreate inside the same transaction so a failed upload never loses an index
+            for _, index_sql in deferred_indexes:
+                cursor.execute(index_sql)
+
+            conn.commit()
+            invalidate_db_caches()
+    except Exception:
+        # Nothing was imported, so don't leave reports for a rolled back upload
+        for report in (duplicates, new_outlets, errors):
+            report.close(publish=False)
+        raise
+
+    for report in (duplicates, new_outlets, errors):
+        report.close()
+
+    imported = state['imported']
+    skipped = state['skipped']
+    outlets_created = state['outlets_created']
+
+    current_app.logger.info(
+        f"Execution upload {file.filename}: {imported} imported, {outlets_created} outlets created, "
+        f"{skipped} duplicates skipped, {errors.count} errors"
+    )
+
+    messages = []
+    if duplicates.count:
+        messages.append(('warning', f'{duplicates.count} duplicates detected in the last 7 days. See {duplicates.path} for details.'))
+
+    if new_outlets.count:
+        messages.append(('info', f'{outlets_created} new outlets created. See {new_outlets.path} for details.'))
+
+    if errors.count:
+        messages.append(('danger', f'{errors.count} errors occurred during import. See {errors.path} for details.'))
+
+    # Comprehensive summary message
+    summary_parts = []
+    if imported > 0:
+        summary_parts.append(f'{imported} executions imported')
+    if outlets_created > 0:
+        summary_parts.append(f'{outlets_created} outlets created')
+    if skipped > 0:
+        summary_parts.append(f'{skipped} duplicates skipped')
+    if errors.count:
+        summary_parts.append(f'{errors.count} errors')
+
+    summary = 'Upload complete: ' + ', '.join(summary_parts) if summary_parts else 'No data processed'
+    messages.append(('success' if imported > 0 or outlets_created > 0 else 'warning', summary))
+    return messages
+
+
+def upload_jobs_dir():
+    return os.path.join(os.getcwd(), 'uploads', 'jobs')
+
+def write_upload_job(job_id, filename, status, messages=()):
+    """Record an upload job's state in its file, where every worker process can read it
+
+    Kept out of the database so queuing or finishing a job never waits on an import's write lock.
+    """
+    jobs_dir = upload_jobs_dir()
+    os.makedirs(jobs_dir, exist_ok=True)
+    path = os.path.join(jobs_dir, job_id + '.json')
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'status': status, 'filename': filename, 'messages': list(messages)}, f)
+    # Swap the file in whole so a status poll never reads it half written
+    os.replace(tmp_path, path)
+
+def prune_upload_jobs():
+    """Delete the oldest finished job files beyond MAX_UPLOAD_JOBS"""
+    jobs_dir = upload_jobs_dir()
+    if not os.path.isdir(jobs_dir):
+        return
+    finished = []
+    for name in os.listdir(jobs_dir):
+        path = os.path.join(jobs_dir, name)
+        try:
+            with open(path, encoding='utf-8') as f:
+                if json.load(f)['status'] in ('done', 'failed'):
+                    finished.append((os.path.getmtime(path), path))
+        except (OSError, ValueError, KeyError):
+            continue
+    finished.sort()
+    for _, path in finished[:-MAX_UPLOAD_JOBS]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def run_execution_upload_job(app, job_id, path, filename):
+    """Background worker body: import a saved upload and record the outcome on its job"""
+    with app.app_context():
+        try:
+            with get_db_connection() as conn:
+                # Another worker process may be importing; queue behind it rather than fail
+                conn.execute(f'PRAGMA busy_timeout = {UPLOAD_LOCK_TIMEOUT * 1000}')
+            write_upload_job(job_id, filename, 'running')
+            with open(path, 'rb') as stream:
+                messages = import_execution_file(FileStorage(stream=stream, filename=filename))
+            write_upload_job(job_id, filename, 'done', messages)
+        except Exception as e:
+            app.logger.error(f"Error processing file {filename}: {str(e)}")
+            write_upload_job(job_id, filename, 'failed', [('danger', f"Error processing file: {str(e)}")])
+        finally:
+            # No request teardown runs in a bare app context
+            close_db_connections(None)
+            os.remove(path)
+
 @admin_bp.route('/executions/upload', methods=['GET', 'POST'])
-@admin_required
 def execution_upload():
-    """Enhanced execution upload with automatic outlet creation"""
+    """Queue an execution upload for the background import worker"""
     if request.method == 'GET':
         return render_template('admin/execution_upload.html')
 
@@ -803,286 +1582,57 @@ def execution_upload():
         flash(f'Invalid file type. Allowed: {", ".join(allowed_extensions)}', 'danger')
         return redirect(request.url)
 
-    try:
-        # Read the uploaded file into a DataFrame
-        if file_ext == '.csv':
-            df = pd.read_csv(file)
-        else:
-            df = pd.read_excel(file)
-
-        # Print columns for debugging
-        current_app.logger.info(f"File columns: {list(df.columns)}")
-        print(f"Excel columns detected: {list(df.columns)}")
-
-        # Clean column names (remove extra spaces, standardize)
-        df.columns = df.columns.str.strip()
-
-        # Create column mapping for flexibility
-        column_mapping = {
-            'URN': ['URN', 'urn', 'Urn', 'URN Code', 'Outlet URN'],
-            'Retail Point Name': ['Retail Point Name', 'Outlet Name', 'Shop Name', 'Point Name', 'Name'],
-            'Customer Name': ['Customer Name', 'Customer', 'Owner Name', 'Owner'],
-            'Address': ['Address', 'Location', 'Full Address'],
-            'Phone': ['Phone', 'Phone Number', 'Contact', 'Mobile'],
-            'Region': ['Region', 'Zone'],
-            'State': ['State'],
-            'LGA': ['LGA', 'Local Govt', 'Local Government', 'Local Government Area'],
-            'Outlet Type': ['Outlet Type', 'Type', 'Shop Type'],
-            'Date': ['Date', 'Execution Date', 'Visit Date'],
-            'Status': ['Status', 'Execution Status'],
-            'Notes': ['Notes', 'Comments', 'Remarks'],
-            'Table': ['Table'],
-            'Chair': ['Chair'],
-            'Parasol': ['Parasol'],
-            'Tarpaulin': ['Tarpaulin'],
-            'Hawker Jacket': ['Hawker Jacket']
-        }
-
-        # Map columns dynamically
-        mapped_columns = {}
-        for standard_col, possible_cols in column_mapping.items():
-            for col in possible_cols:
-                if col in df.columns:
-                    mapped_columns[standard_col] = col
-                    break
-
-        # Validate minimal required columns
-        required_columns = ['URN', 'Retail Point Name']
-        missing_cols = [col for col in required_columns if col not in mapped_columns]
-        if missing_cols:
-            available_cols = list(df.columns)
-            flash(f"Missing required columns: {', '.join(missing_cols)}. Available columns: {', '.join(available_cols)}", 'danger')
-            return redirect(request.url)
-
-        # Convert the DataFrame to a list of dicts with mapped columns
-        execution_data = []
-        for _, row in df.iterrows():
-            mapped_row = {}
-            for std_col, file_col in mapped_columns.items():
-                mapped_row[std_col] = row.get(file_col, '')
-            execution_data.append(mapped_row)
-
-        imported = skipped = outlets_created = 0
-        errors = []
-        duplicates = []
-        new_outlets = []
-
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-
-            for i, row in enumerate(execution_data):
-                try:
-                    urn = str(row.get('URN', '')).strip()
-                    outlet_name = str(row.get('Retail Point Name', '')).strip()
-
-                    if not urn or not outlet_name:
-                        errors.append({
-                            'row': i + 1,
-                            'error': f"Missing required data - URN: '{urn}', Outlet Name: '{outlet_name}'"
-                        })
-                        continue
-
-                    # Check for existing execution in last 7 days (skip duplicate check for new outlets)
-                    if 'new' not in urn.lower():
-                        seven_days_ago = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d %H:%M:%S')
-                        cursor.execute('''
-                            SELECT COUNT(*) FROM executions e
-                            JOIN outlets o ON e.outlet_id = o.id
-                            WHERE (o.urn = ? OR o.outlet_name = ?)
-                            AND e.execution_date >= ?
-                        ''', (urn, outlet_name, seven_days_ago))
-
-                        if cursor.fetchone()[0] > 0:
-                            duplicates.append({
-                                'row': i + 1,
-                                'message': f"Duplicate entry - URN '{urn}' or outlet name '{outlet_name}' has an execution in the last 7 days"
-                            })
-                            skipped += 1
-                            continue
-
-                    # Get or create outlet
-                    outlet_id = None
-
-                    # Check if outlet exists
-                    cursor.execute('SELECT id FROM outlets WHERE urn = ?', (urn,))
-                    outlet = cursor.fetchone()
-
-                    if outlet:
-                        outlet_id = outlet[0]
-                    elif 'new' in urn.lower() or not outlet:
-                        # Create new outlet
-                        try:
-                            new_outlet_data = {
-                                'urn': urn,
-                                'outlet_name': outlet_name,
-                                'customer_name': str(row.get('Customer Name', '')).strip(),
-                                'address': str(row.get('Address', '')).strip(),
-                                'phone': str(row.get('Phone', '')).strip(),
-                                'outlet_type': str(row.get('Outlet Type', 'Shop')).strip(),
-                                'local_govt': str(row.get('LGA', '')).strip(),
-                                'state': str(row.get('State', '')).strip(),
-                                'region': str(row.get('Region', 'SW')).strip()  # Default to SW if not provided
-                            }
-
-                            # Validate required outlet fields
-                            if not new_outlet_data['region']:
-                                new_outlet_data['region'] = 'SW'  # Default region
-
-                            cursor.execute('''
-                                INSERT INTO outlets (
-                                    urn, outlet_name, customer_name, address, phone,
-                                    outlet_type, local_govt, state, region
-                                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            ''', (
-                                new_outlet_data['urn'],
-                                new_outlet_data['outlet_name'],
-                                new_outlet_data['customer_name'],
-                                new_outlet_data['address'],
-                                new_outlet_data['phone'],
-                                new_outlet_data['outlet_type'],
-                                new_outlet_data['local_govt'],
-                                new_outlet_data['state'],
-                                new_outlet_data['region']
-                            ))
-
-                            outlet_id = cursor.lastrowid
-                            outlets_created += 1
-
-                            new_outlets.append({
-                                'row': i + 1,
-                                'urn': urn,
-                                'name': outlet_name,
-                                'region': new_outlet_data['region']
-                            })
-
-                            current_app.logger.info(f"Created new outlet: URN={urn}, Name={outlet_name}")
-
-                        except Exception as outlet_error:
-                            errors.append({
-                                'row': i + 1,
-                                'error': f"Failed to create outlet for URN '{urn}': {str(outlet_error)}"
-                            })
-                            continue
-
-                    if not outlet_id:
-                        errors.append({
-                            'row': i + 1,
-                            'error': f"Could not find or create outlet for URN '{urn}'"
-                        })
-                        continue
-
-                    # Get agent (prefer admin, fallback to first available user)
-                    cursor.execute("SELECT id FROM users WHERE role = 'admin' LIMIT 1")
-                    agent = cursor.fetchone()
-
-
-                    if not agent:
-                        cursor.execute("SELECT id FROM users LIMIT 1")
-                        agent = cursor.fetchone()
-
-                    if not agent:
-                        raise ValueError("No active user found to assign as agent")
-
-                    agent_id = agent[0]
-
-                    # Parse execution date
-                    execution_date_str = str(row.get('Date', '')).strip()
-                    if execution_date_str:
-                        try:
-                            # Try different date formats
-                            for date_format in ['%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%Y-%m-%d %H:%M:%S']:
-                                try:
-                                    execution_date = datetime.strptime(execution_date_str, date_format)
-                                    break
-                                except ValueError:
-                                    continue
-                            else:
-                                execution_date = datetime.now()
-                        except:
-                            execution_date = datetime.now()
-                    else:
-                        execution_date = datetime.now()
-
-                    execution_date_formatted = execution_date.strftime('%Y-%m-%d %H:%M:%S')
-                    status = str(row.get('Status', 'Completed')).strip()
-                    notes = str(row.get('Notes', '')).strip()
-
-                    # Parse products availability
-                    products_available = {}
-                    for product in ['Table', 'Chair', 'Parasol', 'Tarpaulin', 'Hawker Jacket']:
-                        product_value = str(row.get(product, '')).strip().lower()
-                        products_available[product] = product_value in ['true', '1', 'yes', 'y', 'available', 'present']
-
-                    # Insert execution
-                    cursor.execute('''
-                        INSERT INTO executions (
-                            outlet_id, agent_id, execution_date,
-                            status, notes, products_available
-                        ) VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (
-                        outlet_id, agent_id, execution_date_formatted,
-                        status, notes, json.dumps(products_available)
-                    ))
-
-                    imported += 1
-                    current_app.logger.info(f"Imported execution for URN {urn} (row {i+1})")
-
-                except Exception as e:
-                    error_msg = f"Row {i + 1}: {str(e)}"
-                    errors.append({'row': i + 1, 'error': str(e)})
-                    current_app.logger.error(error_msg)
-
-            conn.commit()
-
-        # Create uploads directory with Windows-compatible path
-        uploads_dir = os.path.join(os.getcwd(), 'uploads')
-        os.makedirs(uploads_dir, exist_ok=True)
-
-        # Save duplicates to file if any
-        if duplicates:
-            duplicates_file = os.path.join(uploads_dir, 'duplicates.txt')
-            with open(duplicates_file, 'w', encoding='utf-8') as f:
-                f.write("\n".join([f"Row {d['row']}: {d['message']}" for d in duplicates]))
-            flash(f'{len(duplicates)} duplicates detected in the last 7 days. See {duplicates_file} for details.', 'warning')
-
-        # Save new outlets info if any
-        if new_outlets:
-            new_outlets_file = os.path.join(uploads_dir, 'new_outlets.txt')
-            with open(new_outlets_file, 'w', encoding='utf-8') as f:
-                f.write("New outlets created:\n")
-                for outlet in new_outlets:
-                    f.write(f"Row {outlet['row']}: URN={outlet['urn']}, Name={outlet['name']}, Region={outlet['region']}\n")
-            flash(f'{outlets_created} new outlets created. See {new_outlets_file} for details.', 'info')
-
-        # Save errors to file if any
-        if errors:
-            errors_file = os.path.join(uploads_dir, 'import_errors.txt')
-            with open(errors_file, 'w', encoding='utf-8') as f:
-                f.write("Import errors:\n")
-                for error in errors:
-                    f.write(f"Row {error['row']}: {error['error']}\n")
-            flash(f'{len(errors)} errors occurred during import. See {errors_file} for details.', 'danger')
-
-        # Flash comprehensive summary message
-        summary_parts = []
-        if imported > 0:
-            summary_parts.append(f'{imported} executions imported')
-        if outlets_created > 0:
-            summary_parts.append(f'{outlets_created} outlets created')
-        if skipped > 0:
-            summary_parts.append(f'{skipped} duplicates skipped')
-        if errors:
-            summary_parts.append(f'{len(errors)} errors')
-
-        summary = 'Upload complete: ' + ', '.join(summary_parts) if summary_parts else 'No data processed'
-        flash(summary, 'success' if imported > 0 or outlets_created > 0 else 'warning')
-
-        return redirect(url_for('admin.execution_list'))
+    # Sanitized name for logs, messages and extension sniffing; the path on disk uses the job id.
+    # secure_filename drops non-ASCII stems along with the dot ('報告.csv' -> 'csv'), so fall back
+    # to a generic name whenever the extension the worker sniffs would be lost
+    filename = secure_filename(file.filename)
+    if not filename.lower().endswith(file_ext):
+        filename = f'upload{file_ext}'
+
+    # Park the file on disk so the request can return while the worker imports it
+    job_id = uuid.uuid4().hex
+    pending_dir = os.path.join(os.getcwd(), 'uploads', 'pending')
+    os.makedirs(pending_dir, exist_ok=True)
+    path = os.path.join(pending_dir, job_id + file_ext)
+    file.save(path)
+
+    prune_upload_jobs()
+    write_upload_job(job_id, filename, 'queued')
+    _upload_executor.submit(run_execution_upload_job, current_app._get_current_object(), job_id, path, filename)
+
+    status_url = url_for('admin.execution_upload_status', job_id=job_id)
+    if request.accept_mimetypes.accept_json and not request.accept_mimetypes.accept_html:
+        return jsonify({'job_id': job_id, 'status_url': status_url}), 202
+
+    flash(f'{filename} queued for import. Check {status_url} for the result.', 'info')
+    return redirect(url_for('admin.execution_list'))
 
-    except Exception as e:
-        current_app.logger.error(f"Error processing file {file.filename}: {str(e)}")
-        flash(f"Error processing file: {str(e)}", 'danger')
-        return redirect(request.url)
+@admin_bp.route('/executions/upload/<job_id>')
+def execution_upload_status(job_id):
+    # The job may belong to another worker process, so read its file rather than local state
+    if not UPLOAD_JOB_ID_RE.fullmatch(job_id):
+        return jsonify({'error': 'Unknown upload job'}), 404
+    path = os.path.join(upload_jobs_dir(), job_id + '.json')
+    try:
+        with open(path, encoding='utf-8') as f:
+            job = json.load(f)
+        updated_at = os.path.getmtime(path)
+    except FileNotFoundError:
+        return jsonify({'error': 'Unknown upload job'}), 404
+
+    status = job['status']
+    messages = job['messages']
+    if status in ('queued', 'running') and time.time() - updated_at > UPLOAD_JOB_TIMEOUT:
+        # The worker that owned the job exited before finishing it
+        status = 'failed'
+        messages = [('danger', 'Import was interrupted. Check the executions list before uploading the file again.')]
+
+    return jsonify({
+        'job_id': job_id,
+        'status': status,
+        'filename': job['filename'],
+        'messages': [{'category': category, 'message': message} for category, message in messages]
+    })
 
 # ===== DATABASE MANAGEMENT INTERFACE =====
 
@@ -1090,32 +1640,46 @@ def execution_upload():
 def db_management_required(f):
     @functools.wraps(f)
     def decorated_function(*args, **kwargs):
-        # First check admin access
-        if 'user_id' not in session or session.get('role') != 'admin':
-            flash('Admin access required', 'danger')
-            return redirect(url_for('login'))
-
-        # Then check for database management session
+        # Admin access is already checked by require_admin; this adds the database management session
         if not session.get('db_management_authenticated', False):
             return redirect(url_for('admin.db_management_auth'))
 
         return f(*args, **kwargs)
     return decorated_function
 
+def get_table_names():
+    """Names of the tables in the database, re-read only when the database files change"""
+    signature = db_file_signature()
+    if _table_names_cache.get('key') != signature:
+        with get_db_connection(readonly=True) as conn:
+            names = frozenset(row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'"))
+        _table_names_cache.update(key=signature, names=names)
+    return _table_names_cache['names']
+
+def existing_table_required(f):
+    """Reject unknown <table_name> values before they are interpolated into any SQL"""
+    @functools.wraps(f)
+    def decorated_function(*args, **kwargs):
+        table_name = kwargs['table_name']
+        if table_name not in get_table_names():
+            flash(f'Table {table_name} does not exist', 'danger')
+            return redirect(url_for('admin.db_management_dashboard'))
+        return f(*args, **kwargs)
+    return decorated_function
+
 def hash_password(password):
     """Simple password hashing for database access"""
-    return hashlib.sha256(password.encode()).hexdigest()
+    return hashlib.blake2b(password.encode(), digest_size=32).hexdigest()
 
 # Database Management Authentication
 @admin_bp.route('/db-management/auth', methods=['GET', 'POST'])
-@admin_required
 def db_management_auth():
     """Special authentication for database management interface"""
     if request.method == 'POST':
         password = request.form.get('password', '')
 
-        # Check the special password
-        if password == 'brobotDevMadeThisallTime123?':
+        # Check the special password (constant-time comparison)
+        if hmac.compare_digest(password.encode(), DB_MANAGEMENT_PASSWORD):
             session['db_management_authenticated'] = True
             flash('Database management access granted', 'success')
             return redirect(url_for('admin.db_management_dashboard'))
@@ -1125,7 +1689,6 @@ def db_management_auth():
     return render_template('admin/db_auth.html')
 
 @admin_bp.route('/db-management/logout')
-@admin_required
 def db_management_logout():
     """Logout from database management"""
     session.pop('db_management_authenticated', None)
@@ -1166,6 +1729,7 @@ def db_management_dashboard():
 # Database Table Viewer
 @admin_bp.route('/db-management/table/<table_name>')
 @db_management_required
+@existing_table_required
 def db_table_view(table_name):
     """View table data with pagination"""
     page = request.args.get('page', 1, type=int)
@@ -1186,12 +1750,6 @@ def db_table_view(table_name):
         with get_db_connection() as conn:
             cursor = conn.cursor()
 
-            # Verify table exists
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-            if not cursor.fetchone():
-                flash(f'Table {table_name} does not exist', 'danger')
-                return redirect(url_for('admin.db_management_dashboard'))
-
             # Get table structure
             cursor.execute(f"PRAGMA table_info({table_name})")
             columns = cursor.fetchall()
@@ -1202,17 +1760,17 @@ def db_table_view(table_name):
             if sort_by and sort_by not in column_names:
                 sort_by = ''
 
-            # Build base query
-            base_query = f"SELECT * FROM {table_name}"
+            # Build search filter, shared by the count and the page query
+            where_clause = ''
             params = []
-
-            # Add search if provided
             if search:
                 search_conditions = []
                 for col in column_names:
                     search_conditions.append(f"{col} LIKE ?")
                     params.append(f"%{search}%")
-                base_query += " WHERE " + " OR ".join(search_conditions)
+                where_clause = " WHERE " + " OR ".join(search_conditions)
+
+            base_query = f"SELECT * FROM {table_name}{where_clause}"
 
             # Add sorting
             if sort_by:
@@ -1220,13 +1778,13 @@ def db_table_view(table_name):
             elif 'id' in column_names:
                 base_query += f" ORDER BY id {order}"
 
-            # Get total count
-            count_query = f"SELECT COUNT(*) FROM ({base_query})"
-            cursor.execute(count_query, params)
+            # Get total count straight from the table (no sub-select, no ORDER BY)
+            cursor.execute(f"SELECT COUNT(*) FROM {table_name}{where_clause}", params)
             total_records = cursor.fetchone()[0]
 
-            # Calculate pagination
+            # Calculate pagination; clamp the page so out-of-range requests don't walk a deep OFFSET
             total_pages = math.ceil(total_records / per_page)
+            page = min(max(page, 1), max(total_pages, 1))
             offset = (page - 1) * per_page
 
             # Get paginated results
@@ -1262,6 +1820,7 @@ def db_table_view(table_name):
 # Database Record Edit
 @admin_bp.route('/db-management/table/<table_name>/edit/<int:record_id>', methods=['GET', 'POST'])
 @db_management_required
+@existing_table_required
 def db_record_edit(table_name, record_id):
     """Edit a database record"""
     try:
@@ -1286,6 +1845,7 @@ def db_record_edit(table_name, record_id):
 
                 cursor.execute(update_query, list(update_data.values()) + [record_id])
                 conn.commit()
+                invalidate_db_caches()
 
                 flash(f'Record {record_id} updated successfully', 'success')
                 return redirect(url_for('admin.db_table_view', table_name=table_name))
@@ -1317,6 +1877,7 @@ def db_record_edit(table_name, record_id):
 # Database Record Create
 @admin_bp.route('/db-management/table/<table_name>/create', methods=['GET', 'POST'])
 @db_management_required
+@existing_table_required
 def db_record_create(table_name):
     """Create a new database record"""
     try:
@@ -1342,6 +1903,7 @@ def db_record_create(table_name):
 
                 cursor.execute(insert_query, list(insert_data.values()))
                 conn.commit()
+                invalidate_db_caches()
 
                 new_id = cursor.lastrowid
                 flash(f'New record created with ID {new_id}', 'success')
@@ -1358,6 +1920,7 @@ def db_record_create(table_name):
 # Database Record Delete
 @admin_bp.route('/db-management/table/<table_name>/delete/<int:record_id>', methods=['POST'])
 @db_management_required
+@existing_table_required
 def db_record_delete(table_name, record_id):
     """Delete a database record"""
     try:
@@ -1373,6 +1936,7 @@ def db_record_delete(table_name, record_id):
 
             if cursor.rowcount > 0:
                 conn.commit()
+                invalidate_db_caches()
                 flash(f'Record {record_id} deleted successfully', 'success')
             else:
                 flash(f'Record {record_id} not found', 'warning')
@@ -1385,6 +1949,7 @@ def db_record_delete(table_name, record_id):
 # Bulk Operations
 @admin_bp.route('/db-management/table/<table_name>/bulk-delete', methods=['POST'])
 @db_management_required
+@existing_table_required
 def db_bulk_delete(table_name):
     """Bulk delete selected records"""
     selected_ids = request.form.getlist('selected_records')
@@ -1406,12 +1971,15 @@ def db_bulk_delete(table_name):
                 flash('No valid records to delete', 'warning')
                 return redirect(url_for('admin.db_table_view', table_name=table_name))
 
-            # Delete records
-            placeholders = ','.join(['?' for _ in selected_ids])
-            cursor.execute(f"DELETE FROM {table_name} WHERE id IN ({placeholders})", selected_ids)
+            # Delete records in bounded IN (...) batches, all in one transaction
+            cursor.execute('BEGIN IMMEDIATE')
+            deleted_count = 0
+            for id_batch in iter_chunks(selected_ids):
+                cursor.execute(f"DELETE FROM {table_name} WHERE id IN ({','.join('?' * len(id_batch))})", id_batch)
+                deleted_count += cursor.rowcount
 
-            deleted_count = cursor.rowcount
             conn.commit()
+            invalidate_db_caches()
 
             flash(f'Successfully deleted {deleted_count} records', 'success')
 
@@ -1423,6 +1991,7 @@ def db_bulk_delete(table_name):
 # Table Management
 @admin_bp.route('/db-management/table/<table_name>/truncate', methods=['POST'])
 @db_management_required
+@existing_table_required
 def db_table_truncate(table_name):
     """Truncate (delete all data from) a table"""
     try:
@@ -1453,6 +2022,7 @@ def db_table_truncate(table_name):
 
             deleted_count = cursor.rowcount
             conn.commit()
+            invalidate_db_caches()
 
             flash(f'Successfully truncated table {table_name} - deleted {deleted_count} records', 'success')
 
@@ -1467,6 +2037,7 @@ def db_table_truncate(table_name):
 def db_sql_query():
     """Execute custom SQL queries"""
     results = None
+    columns = []
     error = None
     query = ''
 
@@ -1477,27 +2048,35 @@ def db_sql_query():
             flash('Please enter a SQL query', 'warning')
         else:
             try:
-                with get_db_connection() as conn:
+                # Plain SELECTs run on a read-only connection
+                with get_db_connection(readonly=bool(SELECT_QUERY_RE.match(query))) as conn:
                     cursor = conn.cursor()
 
                     # Execute query
                     cursor.execute(query)
 
-                    # Check if it's a SELECT query
-                    if query.strip().upper().startswith('SELECT'):
-                        results = cursor.fetchall()
-                        # Get column names
-                        columns = [description[0] for description in cursor.description] if cursor.description else []
-
-                        # Convert to list of dicts
-                        if results and columns:
-                            results = [dict(zip(columns, row)) for row in results]
-
-                        flash(f'Query executed successfully. {len(results)} rows returned.', 'success')
+                    # Anything with a result set (SELECT, WITH ... SELECT, PRAGMA, ... RETURNING) is previewed
+                    if cursor.description is not None:
+                        # Only step SQLite as far as the preview needs; one extra row detects truncation
+                        results = cursor.fetchmany(MAX_PREVIEW_ROWS)
+                        truncated = cursor.fetchone() is not None
+                        columns = [description[0] for description in cursor.description]
+
+                        # sqlite3 only opens a transaction for statements that write, e.g. DELETE ... RETURNING
+                        if conn.in_transaction:
+                            conn.commit()
+                            invalidate_db_caches()
+
+                        if truncated:
+                            flash(f'Query executed successfully. Showing the first {len(results)} rows; '
+                                  f'add a LIMIT or export the table to see more.', 'warning')
+                        else:
+                            flash(f'Query executed successfully. {len(results)} rows returned.', 'success')
                     else:
-                        # For non-SELECT queries
+                        # For statements without a result set
                         affected_rows = cursor.rowcount
                         conn.commit()
+                        invalidate_db_caches()
                         flash(f'Query executed successfully. {affected_rows} rows affected.', 'success')
 
             except Exception as e:
@@ -1506,97 +2085,104 @@ def db_sql_query():
 
     return render_template('admin/db_sql_query.html',
                          query=query,
-                         results=results,
+                         columns=columns,
+                         rows=results,
                          error=error)
 
 # Database Export
 @admin_bp.route('/db-management/export/<table_name>')
 @db_management_required
+@existing_table_required
 def db_export_table(table_name):
     """Export table data to CSV"""
     try:
-        with get_db_connection() as conn:
+        with get_db_connection(readonly=True) as conn:
             cursor = conn.cursor()
 
-            # Get all data
-            cursor.execute(f"SELECT * FROM {table_name}")
-            data = cursor.fetchall()
+            # Column names from the result description; also fails fast on an unknown table
+            cursor.execute(f'SELECT * FROM "{table_name}" LIMIT 0')
+            column_names = [d[0] for d in cursor.description]
 
-            # Get column names
-            cursor.execute(f"PRAGMA table_info({table_name})")
-            columns = cursor.fetchall()
-            column_names = [col[1] for col in columns]
-
-            # Create CSV
-            output = io.StringIO()
-            writer = csv.writer(output)
-
-            # Write header
-            writer.writerow(column_names)
+    except Exception as e:
+        flash(f'Error exporting table {table_name}: {str(e)}', 'danger')
+        return redirect(url_for('admin.db_table_view', table_name=table_name))
 
-            # Write data
-            for row in data:
-                writer.writerow(row)
+    def generate():
+        writer = csv.writer(_Echo())
 
-            # Prepare response
-            csv_data = output.getvalue()
-            output.close()
+        # Write header
+        yield writer.writerow(column_names).encode('utf-8')
 
-            # Create response
-            response = current_app.response_class(
-                csv_data,
-                mimetype='text/csv',
-                headers={"Content-disposition": f"attachment; filename={table_name}_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"}
-            )
+        # Stream rows in fetchmany batches; the connection stays open while the response streams
+        with get_db_connection(readonly=True) as conn:
+            cursor = conn.cursor()
+            cursor.arraysize = EXPORT_FETCH_SIZE
+            cursor.execute(f'SELECT * FROM "{table_name}"')
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                yield ''.join(map(writer.writerow, rows)).encode('utf-8')
 
-            return response
-
-    except Exception as e:
-        flash(f'Error exporting table {table_name}: {str(e)}', 'danger')
-        return redirect(url_for('admin.db_table_view', table_name=table_name))
+    return current_app.response_class(
+        stream_with_context(generate()),
+        mimetype='text/csv',
+        headers={"Content-disposition": f"attachment; filename={table_name}_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"}
+    )
 
 # Database Information
 @admin_bp.route('/db-management/info')
 @db_management_required
 def db_info():
     """Show database information and statistics"""
+    # Serve the previous result while the database files are untouched, re-checking at least every minute
+    signature = db_file_signature()
+    if (_db_info_cache.get('key') == signature
+            and time.monotonic() - _db_info_cache['time'] < DB_INFO_CACHE_TTL):
+        return render_template('admin/db_info.html', **_db_info_cache['context'])
+
     try:
-        with get_db_connection() as conn:
+        with get_db_connection(readonly=True) as conn:
             cursor = conn.cursor()
 
             # Database file info
-            import os
             db_path = 'maindatabase.db'
             db_size = os.path.getsize(db_path) if os.path.exists(db_path) else 0
             db_size_mb = db_size / (1024 * 1024)
 
-            # Get SQLite version
-            cursor.execute("SELECT sqlite_version()")
-            sqlite_version = cursor.fetchone()[0]
-
-            # Get page count and size
-            cursor.execute("PRAGMA page_count")
-            page_count = cursor.fetchone()[0]
-
-            cursor.execute("PRAGMA page_size")
-            page_size = cursor.fetchone()[0]
-
-            # Get all tables with their info
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
-            tables = [row[0] for row in cursor.fetchall()]
+            sqlite_version = sqlite3.sqlite_version
+            cursor.execute('''
+                SELECT (SELECT page_count FROM pragma_page_count),
+                       (SELECT page_size FROM pragma_page_size)
+            ''')
+            page_count, page_size = cursor.fetchone()
 
+            # On-disk size per table and index; dbstat is an optional compile-time module
+            try:
+                cursor.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name")
+                object_sizes = dict(cursor.fetchall())
+            except sqlite3.OperationalError:
+                object_sizes = {}
+
+            # Column details for every table in one query via the pragma_table_info() table function
+            cursor.execute('''
+                SELECT m.name, p.cid, p.name, p.type, p."notnull", p.dflt_value, p.pk
+                FROM sqlite_master m JOIN pragma_table_info(m.name) p
+                WHERE m.type = 'table'
+                ORDER BY m.name, p.cid
+            ''')
+            table_columns = {}
+            for table, *column in cursor.fetchall():
+                table_columns.setdefault(table, []).append(tuple(column))
+
+            table_counts = get_table_counts(conn, list(table_columns))
             table_info = {}
-            for table in tables:
-                cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                count = cursor.fetchone()[0]
-
-                cursor.execute(f"PRAGMA table_info({table})")
-                columns = cursor.fetchall()
-
+            for table, columns in table_columns.items():
                 table_info[table] = {
-                    'count': count,
+                    'count': table_counts[table],
                     'columns': len(columns),
-                    'column_details': columns
+                    'column_details': columns,
+                    'size_bytes': object_sizes.get(table)
                 }
 
             # Get indexes
@@ -1616,7 +2202,6 @@ def db_info():
         flash(f'Error getting database info: {str(e)}', 'danger')
         return redirect(url_for('admin.db_management_dashboard'))
 
-    return render_template('admin/db_info.html',
-                         db_stats=db_stats,
-                         table_info=table_info,
-                         indexes=indexes)
+    context = {'db_stats': db_stats, 'table_info': table_info, 'indexes': indexes}
+    _db_info_cache.update(key=signature, time=time.monotonic(), context=context)
+    return render_template('admin/db_info.html', **context)
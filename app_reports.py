@@ -1,4 +1,4 @@
-from flask import Blueprint, jsonify, request, render_template, redirect, url_for, flash, session
+from flask import Blueprint, jsonify, request, render_template, redirect, url_for, flash, session, g, has_app_context
 import sqlite3
 import json
 import random
@@ -21,6 +21,12 @@ REGIONS = ['SW', 'SE', 'NC', 'NW', 'NE']
 
 AUTHORIZED_ROLES = ['admin', 'general_subadmin', 'regional_subadmin', 'state_subadmin']
 
+# Keys per IN (...) lookup query, well under SQLite's bound-parameter limit
+LOOKUP_BATCH_SIZE = 500
+
+# Python types sqlite3 can bind as query parameters
+SQL_VALUE_TYPES = (str, int, float, bytes, type(None))
+
 IMAGE_ANALYSIS_CATEGORIES = [
     'Product Placement',
     'Branding Visibility',
@@ -29,23 +35,65 @@ IMAGE_ANALYSIS_CATEGORIES = [
     'Overall Cleanliness'
 ]
 
+# Database settings applied once per process
+_db_static_info = {}
+
 # Database helper functions
+def open_db_connection():
+    """Open and configure a new connection to maindatabase.db"""
+    conn = sqlite3.connect('maindatabase.db')
+    # journal_mode is stored in the database file, so switching once per process is enough
+    if not _db_static_info.get('wal'):
+        conn.execute('PRAGMA journal_mode = WAL')
+        _db_static_info['wal'] = True
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.execute('PRAGMA foreign_keys = ON')
+    conn.execute('PRAGMA cache_size = -65536')  # 64MiB
+    conn.execute('PRAGMA temp_store = MEMORY')
+    conn.execute('PRAGMA mmap_size = 268435456')  # 256MB
+    conn.row_factory = sqlite3.Row
+    return conn
+
 @contextmanager
 def get_db_connection():
-    """Context manager for database connections with automatic cleanup"""
-    conn = None
+    """Context manager for the request's database connection
+
+    Inside a request the connection is opened on first use, kept on flask.g and closed by
+    close_db_connection() at teardown. Outside one a private connection is opened and closed
+    around the block.
+    """
+    if has_app_context():
+        conn = g.get('reports_db')
+        if conn is None:
+            conn = g.reports_db = open_db_connection()
+        shared = True
+    else:
+        conn = open_db_connection()
+        shared = False
     try:
-        conn = sqlite3.connect('maindatabase.db')
-        conn.row_factory = sqlite3.Row
         yield conn
     except Exception as e:
-        if conn:
-            conn.rollback()
+        conn.rollback()
         logging.error(f"Database error: {e}")
         raise
     finally:
-        if conn:
+        if not shared:
             conn.close()
+        elif conn.in_transaction:
+            # Same as closing: work a block left uncommitted is discarded, not carried into the next one
+            conn.rollback()
+
+@reports_bp.teardown_app_request
+def close_db_connection(exception):
+    conn = g.pop('reports_db', None)
+    if conn is not None:
+        # Let SQLite refresh planner statistics for tables this request's queries leaned on;
+        # best effort, a busy database just skips it this time
+        try:
+            conn.execute('PRAGMA optimize')
+        except sqlite3.Error:
+            pass
+        conn.close()
 
 def execute_query(query, params=None, fetch_one=False, fetch_all=True):
     """Execute database query with proper error handling"""
@@ -61,6 +109,45 @@ def execute_query(query, params=None, fetch_one=False, fetch_all=True):
             conn.commit()
             return cursor.rowcount
 
+def collect_keys(rows, field):
+    """Distinct non-empty string values of field across the uploaded rows, stripped"""
+    keys = set()
+    for row in rows:
+        value = row.get(field) if isinstance(row, dict) else None
+        if isinstance(value, str) and value.strip():
+            keys.add(value.strip())
+    return keys
+
+def fetch_ids_by_key(cursor, table, column, keys):
+    """Map each key found in table.column to its row id, one IN query per batch of keys"""
+    keys = list(keys)
+    ids = {}
+    for start in range(0, len(keys), LOOKUP_BATCH_SIZE):
+        batch = keys[start:start + LOOKUP_BATCH_SIZE]
+        cursor.execute(f"SELECT {column}, id FROM {table} WHERE {column} IN ({','.join('?' * len(batch))})", batch)
+        ids.update(cursor.fetchall())
+    return ids
+
+def insert_rows(cursor, query, rows):
+    """Run query for every row with one executemany, retrying row by row if any row breaks a constraint
+
+    Returns {index: error} for the rows SQLite rejected; every other row is written either way.
+    """
+    failed = {}
+    cursor.execute('SAVEPOINT insert_rows')
+    try:
+        cursor.executemany(query, rows)
+    except sqlite3.IntegrityError:
+        # Undo the partial batch, then find the offending rows; a failed statement writes nothing
+        cursor.execute('ROLLBACK TO insert_rows')
+        for index, row in enumerate(rows):
+            try:
+                cursor.execute(query, row)
+            except sqlite3.IntegrityError as e:
+                failed[index] = e
+    cursor.execute('RELEASE insert_rows')
+    return failed
+
 # Decorators
 def role_required(allowed_roles):
     """Decorator to check user role authorization"""
@@ -76,29 +163,21 @@ def role_required(allowed_roles):
     return decorator
 
 # Report generation functions
-def process_product_availability_data(executions):
-    """Process execution data for product availability statistics"""
+def process_product_availability_data(region_totals, available_counts):
+    """Fold per-region execution totals and per-region/product available counts into report stats"""
     product_stats = {product: {'available': 0, 'not_available': 0} for product in DANGOTE_PRODUCTS}
     product_by_region = {}
     
-    for exe in executions:
-        products = json.loads(exe['products_available']) if exe['products_available'] else {}
-        region = exe['region']
-        
-        # Initialize region if not exists
-        if region not in product_by_region:
-            product_by_region[region] = {product: {'available': 0, 'not_available': 0} for product in DANGOTE_PRODUCTS}
-        
-        # Process each product
+    for region, total in region_totals:
+        product_by_region[region] = {product: {'available': 0, 'not_available': total} for product in DANGOTE_PRODUCTS}
         for product in DANGOTE_PRODUCTS:
-            is_available = product in products and products[product]
-            
-            if is_available:
-                product_stats[product]['available'] += 1
-                product_by_region[region][product]['available'] += 1
-            else:
-                product_stats[product]['not_available'] += 1
-                product_by_region[region][product]['not_available'] += 1
+            product_stats[product]['not_available'] += total
+    
+    for region, product, available in available_counts:
+        product_by_region[region][product]['available'] += available
+        product_by_region[region][product]['not_available'] -= available
+        product_stats[product]['available'] += available
+        product_stats[product]['not_available'] -= available
     
     return product_stats, product_by_region
 
@@ -117,9 +196,9 @@ def product_availability_report():
     date_range = request.args.get('date_range', 'month')
     
     try:
-        # Build query with optional region filter
+        # Executions per region, with optional region filter
         query = '''
-        SELECT e.id, e.products_available, o.region, o.state, o.local_govt, o.outlet_name, e.execution_date
+        SELECT o.region, COUNT(*)
         FROM executions e
         JOIN outlets o ON e.outlet_id = o.id
         WHERE e.products_available IS NOT NULL
@@ -128,14 +207,35 @@ def product_availability_report():
         params = []
         query, params = build_region_filter_query(query, region, params)
         
-        executions = execute_query(query, params)
+        region_totals = execute_query(query + ' GROUP BY o.region', params)
         
         # Return sample data if no executions found
-        if not executions:
+        if not region_totals:
             return jsonify(generate_sample_product_data(DANGOTE_PRODUCTS))
         
+        # Count available products per region in SQL instead of decoding every row in Python;
+        # a product is available when its JSON value is truthy, as bool(json.loads(...)) would say
+        query = f'''
+        SELECT o.region, p.key, COUNT(*)
+        FROM executions e
+        JOIN outlets o ON e.outlet_id = o.id
+        JOIN json_each(NULLIF(e.products_available, '')) p
+        WHERE e.products_available IS NOT NULL
+          AND p.key IN ({','.join('?' * len(DANGOTE_PRODUCTS))})
+          AND (p.type = 'true'
+               OR (p.type IN ('integer', 'real') AND p.value != 0)
+               OR (p.type = 'text' AND p.value != '')
+               OR (p.type = 'array' AND p.value != '[]')
+               OR (p.type = 'object' AND p.value != '{{}}'))
+        '''
+        
+        params = list(DANGOTE_PRODUCTS)
+        query, params = build_region_filter_query(query, region, params)
+        
+        available_counts = execute_query(query + ' GROUP BY o.region, p.key', params)
+        
         # Process real data
-        product_stats, product_by_region = process_product_availability_data(executions)
+        product_stats, product_by_region = process_product_availability_data(region_totals, available_counts)
         
         return jsonify({
             'product_stats': product_stats,
@@ -313,6 +413,11 @@ def process_outlet_data(report_data, cursor):
     """Process outlet data from uploaded report"""
     imported = updated = skipped = errors = 0
     details = []
+    outlet_rows = []
+    queued = []
+    
+    # Look up every URN in the report up front instead of once per row
+    existing_urns = fetch_ids_by_key(cursor, 'outlets', 'urn', collect_keys(report_data, 'URN'))
     
     for row in report_data:
         try:
@@ -331,39 +436,51 @@ def process_outlet_data(report_data, cursor):
                 skipped += 1
                 continue
             
-            # Check if outlet exists
-            cursor.execute('SELECT id FROM outlets WHERE urn = ?', (urn,))
-            existing = cursor.fetchone()
-            
-            if existing:
-                # Update existing outlet
-                cursor.execute('''
-                UPDATE outlets 
-                SET outlet_name = ?, address = ?, phone = ?, outlet_type = ?, 
-                    local_govt = ?, state = ?, region = ?
-                WHERE urn = ?
-                ''', (outlet_name, address, phone, outlet_type, lga, state, region, urn))
-                updated += 1
-                details.append(f'Updated outlet: {outlet_name} ({urn})')
-            else:
-                # Insert new outlet
-                cursor.execute('''
-                INSERT INTO outlets (urn, outlet_name, address, phone, outlet_type, local_govt, state, region)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (urn, outlet_name, address, phone, outlet_type, lga, state, region))
-                imported += 1
-                details.append(f'Imported new outlet: {outlet_name} ({urn})')
+            # Queue the row; its detail line is filled in once the row is written
+            queued.append((len(details), urn, outlet_name))
+            details.append(None)
+            outlet_rows.append((urn, outlet_name, address, phone, outlet_type, lga, state, region))
                 
         except Exception as e:
             errors += 1
             details.append(f'Error processing row {urn}: {str(e)}')
     
+    # One upsert statement for every row: new URNs are inserted, existing ones updated
+    failed = insert_rows(cursor, '''
+    INSERT INTO outlets (urn, outlet_name, address, phone, outlet_type, local_govt, state, region)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(urn) DO UPDATE SET
+        outlet_name = excluded.outlet_name, address = excluded.address, phone = excluded.phone,
+        outlet_type = excluded.outlet_type, local_govt = excluded.local_govt,
+        state = excluded.state, region = excluded.region
+    ''', outlet_rows)
+    
+    # Rows are written in report order, so a URN exists once the database or an earlier row has it
+    stored_urns = set(existing_urns)
+    for index, (position, urn, outlet_name) in enumerate(queued):
+        if index in failed:
+            errors += 1
+            details[position] = f'Error processing row {urn}: {str(failed[index])}'
+        elif urn in stored_urns:
+            updated += 1
+            details[position] = f'Updated outlet: {outlet_name} ({urn})'
+        else:
+            imported += 1
+            stored_urns.add(urn)
+            details[position] = f'Imported new outlet: {outlet_name} ({urn})'
+    
     return imported, updated, skipped, errors, details
 
 def process_execution_data(report_data, cursor):
     """Process execution data from uploaded report"""
     imported = skipped = errors = 0
     details = []
+    execution_rows = []
+    positions = []
+    
+    # Resolve every outlet and agent in the report up front instead of once per row
+    outlet_ids = fetch_ids_by_key(cursor, 'outlets', 'urn', collect_keys(report_data, 'Outlet URN'))
+    agent_ids = fetch_ids_by_key(cursor, 'users', 'username', collect_keys(report_data, 'Agent Username'))
     
     for row in report_data:
         try:
@@ -374,32 +491,39 @@ def process_execution_data(report_data, cursor):
             notes = row.get('Notes', '').strip()
             
             # Get outlet ID
-            cursor.execute('SELECT id FROM outlets WHERE urn = ?', (outlet_urn,))
-            outlet = cursor.fetchone()
-            if not outlet:
+            outlet_id = outlet_ids.get(outlet_urn)
+            if not outlet_id:
                 skipped += 1
                 details.append(f'Outlet not found: {outlet_urn}')
                 continue
             
             # Get agent ID
-            cursor.execute('SELECT id FROM users WHERE username = ?', (agent_username,))
-            agent = cursor.fetchone()
-            if not agent:
+            agent_id = agent_ids.get(agent_username)
+            if not agent_id:
                 skipped += 1
                 details.append(f'Agent not found: {agent_username}')
                 continue
             
-            # Insert execution record
-            cursor.execute('''
-            INSERT INTO executions (outlet_id, agent_id, execution_date, status, notes)
-            VALUES (?, ?, ?, ?, ?)
-            ''', (outlet[0], agent[0], execution_date, status, notes))
-            imported += 1
+            # Queue execution record, keeping a slot for its error detail
+            execution_rows.append((outlet_id, agent_id, execution_date, status, notes))
+            positions.append(len(details))
+            details.append(None)
             
         except Exception as e:
             errors += 1
             details.append(f'Error processing execution: {str(e)}')
     
+    failed = insert_rows(cursor, '''
+    INSERT INTO executions (outlet_id, agent_id, execution_date, status, notes)
+    VALUES (?, ?, ?, ?, ?)
+    ''', execution_rows)
+    
+    imported = len(execution_rows) - len(failed)
+    errors += len(failed)
+    for index, e in failed.items():
+        details[positions[index]] = f'Error processing execution: {str(e)}'
+    details = [detail for detail in details if detail is not None]
+    
     return imported, 0, skipped, errors, details
 
 @reports_bp.route('/reports/upload', methods=['POST'])
@@ -431,6 +555,10 @@ def upload_report():
             cursor = conn.cursor()
             total = len(report_data)
             
+            # Single write transaction for the whole report; get_db_connection
+            # rolls it back if anything escapes the per-row handling
+            cursor.execute('BEGIN IMMEDIATE')
+            
             if report_type == 'outlet':
                 imported, updated, skipped, errors, details = process_outlet_data(report_data, cursor)
             elif report_type == 'execution':
@@ -479,10 +607,20 @@ def bulk_execution_upload():
         
         imported = errors = 0
         details = []
+        execution_rows = []
+        positions = []
         
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
+            # Single write transaction for the whole upload; get_db_connection
+            # rolls it back if anything escapes the per-row handling
+            cursor.execute('BEGIN IMMEDIATE')
+            
+            # Resolve every outlet and agent in the upload up front instead of once per row
+            outlet_ids = fetch_ids_by_key(cursor, 'outlets', 'urn', collect_keys(executions, 'outlet_urn'))
+            agent_ids = fetch_ids_by_key(cursor, 'users', 'username', collect_keys(executions, 'agent_username'))
+            
             for execution_data in executions:
                 try:
                     # Extract execution data
@@ -498,34 +636,46 @@ def bulk_execution_upload():
                     status = execution_data.get('status', 'Completed')
                     
                     # Get outlet and agent IDs
-                    cursor.execute('SELECT id FROM outlets WHERE urn = ?', (outlet_urn,))
-                    outlet = cursor.fetchone()
-                    
-                    cursor.execute('SELECT id FROM users WHERE username = ?', (agent_username,))
-                    agent = cursor.fetchone()
+                    outlet_id = outlet_ids.get(outlet_urn)
+                    agent_id = agent_ids.get(agent_username)
                     
-                    if not outlet or not agent:
+                    if not outlet_id or not agent_id:
                         errors += 1
                         details.append(f'Outlet {outlet_urn} or Agent {agent_username} not found')
                         continue
                     
-                    # Insert execution record
-                    cursor.execute('''
-                    INSERT INTO executions 
-                    (outlet_id, agent_id, execution_date, before_image, after_image, 
-                     latitude, longitude, notes, products_available, status)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (outlet[0], agent[0], execution_date, before_image, after_image,
-                          latitude, longitude, notes, products_available, status))
+                    values = (outlet_id, agent_id, execution_date, before_image, after_image,
+                              latitude, longitude, notes, products_available, status)
+                    
+                    # Reject what SQLite can't bind now, while the error can still be reported per row
+                    for value in values:
+                        if not isinstance(value, SQL_VALUE_TYPES):
+                            raise ValueError(f'unsupported value type {type(value).__name__}')
                     
-                    imported += 1
+                    # Queue execution record, keeping a slot for its error detail
+                    execution_rows.append(values)
+                    positions.append(len(details))
+                    details.append(None)
                     
                 except Exception as e:
                     errors += 1
                     details.append(f'Error processing execution: {str(e)}')
             
+            failed = insert_rows(cursor, '''
+            INSERT INTO executions 
+            (outlet_id, agent_id, execution_date, before_image, after_image, 
+             latitude, longitude, notes, products_available, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', execution_rows)
+            
             conn.commit()
         
+        imported = len(execution_rows) - len(failed)
+        errors += len(failed)
+        for index, e in failed.items():
+            details[positions[index]] = f'Error processing execution: {str(e)}'
+        details = [detail for detail in details if detail is not None]
+        
         return jsonify({
             'success': True,
             'imported': imported,
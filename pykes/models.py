@@ -128,6 +128,8 @@ def init_db():
             c.execute('CREATE INDEX IF NOT EXISTS idx_outlets_type ON outlets(outlet_type)')
             c.execute('CREATE INDEX IF NOT EXISTS idx_outlets_active ON outlets(is_active)')
             c.execute('CREATE INDEX IF NOT EXISTS idx_outlets_urn ON outlets(urn)')
+            c.execute('CREATE INDEX IF NOT EXISTS idx_outlets_listing ON outlets(region, state, local_govt, outlet_name)')
+            c.execute('CREATE INDEX IF NOT EXISTS idx_outlets_name ON outlets(outlet_name)')
 
             # Create users table with enhanced constraints
             c.execute('''
@@ -158,6 +160,8 @@ def init_db():
             c.execute('CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)')
             c.execute('CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)')
             c.execute('CREATE INDEX IF NOT EXISTS idx_users_region ON users(region)')
+            c.execute('CREATE INDEX IF NOT EXISTS idx_users_state ON users(state)')
+            c.execute('CREATE INDEX IF NOT EXISTS idx_users_lga ON users(lga)')
             c.execute('CREATE INDEX IF NOT EXISTS idx_users_active ON users(is_active)')
 
             # Create executions table with comprehensive tracking
@@ -207,6 +211,8 @@ def init_db():
             c.execute('CREATE INDEX IF NOT EXISTS idx_executions_review ON executions(review_status)')
             c.execute('CREATE INDEX IF NOT EXISTS idx_executions_created ON executions(created_at)')
             c.execute('CREATE INDEX IF NOT EXISTS idx_executions_coords ON executions(latitude, longitude)')
+            c.execute('CREATE INDEX IF NOT EXISTS idx_executions_outlet_date ON executions(outlet_id, execution_date)')
+            c.execute('CREATE INDEX IF NOT EXISTS idx_executions_date_outlet ON executions(execution_date, outlet_id)')
 
             # Create profile table for customizable branding
             c.execute('''
@@ -257,6 +263,9 @@ def init_db():
                     
             # Commit all changes
             conn.commit()
+
+            # Refresh planner statistics so new indexes get used (cheap no-op when up to date)
+            c.execute('PRAGMA optimize')
             logger.info("Database initialized successfully")
             
     except Exception as e:
@@ -5,6 +5,7 @@ import os
 import pytest
 import tempfile
 import shutil
+import sqlite3
 from pathlib import Path
 from unittest.mock import patch
 
@@ -61,6 +62,33 @@ def db(app):
         
         yield
 
+@pytest.fixture
+def upload_db(app, tmp_path, monkeypatch):
+    """Fresh schema in a temporary working directory for the upload blueprints
+
+    The admin and reports blueprints open maindatabase.db relative to the working directory,
+    so changing into tmp_path gives each test its own database with the full set of constraints.
+    """
+    monkeypatch.chdir(tmp_path)
+    init_db()
+    conn = sqlite3.connect('maindatabase.db')
+    conn.row_factory = sqlite3.Row
+    conn.execute(
+        "INSERT INTO users (username, password, full_name, role) VALUES ('admin', 'admin123', 'Admin User', 'admin')"
+    )
+    conn.commit()
+    yield conn
+    conn.close()
+
+@pytest.fixture
+def admin_client(client):
+    """Test client with an admin session"""
+    with client.session_transaction() as sess:
+        sess['user_id'] = 1
+        sess['username'] = 'admin'
+        sess['role'] = 'admin'
+    return client
+
 @pytest.fixture
 def auth_headers(client):
     """Create authentication headers for testing"""
@@ -0,0 +1,55 @@
+# tests/test_admin_imports.py
+# Integration tests for the admin CSV user and outlet imports
+
+import io
+import pytest
+
+
+def import_file(client, url, content):
+    return client.post(url, data={'csv_file': (io.BytesIO(content), 'import.csv')},
+                       content_type='multipart/form-data')
+
+
+def flashes(client):
+    with client.session_transaction() as sess:
+        return sess.get('_flashes', [])
+
+
+@pytest.mark.integration
+@pytest.mark.upload
+@pytest.mark.database
+class TestCsvImportReadErrors:
+    """A file that cannot be decoded partway through is rejected with a flash, not a 500"""
+
+    # Enough rows that the bad byte lands well past the reader's first buffer
+    GOOD_ROWS = 3000
+
+    def test_outlet_import_bad_byte_late_in_file(self, admin_client, upload_db):
+        """Test an invalid UTF-8 byte after 8KB rolls the import back and flashes the error"""
+        lines = ['urn,outlet_name,region']
+        lines += [f'DCP/22/SW/ED/{i:07d},OUTLET {i},SW' for i in range(self.GOOD_ROWS)]
+        content = ('\n'.join(lines) + '\n').encode() + b'DCP/22/SW/ED/9999999,BAD \xff OUTLET,SW\n'
+        assert content.index(b'\xff') > 8192
+
+        response = import_file(admin_client, '/admin/outlets/import', content)
+
+        assert response.status_code == 302
+        assert response.location.endswith('/admin/outlets/import')
+        assert any(category == 'danger' and message.startswith('Error processing file:')
+                   for category, message in flashes(admin_client))
+        assert upload_db.execute('SELECT COUNT(*) FROM outlets').fetchone()[0] == 0
+
+    def test_user_import_bad_byte_late_in_file(self, admin_client, upload_db):
+        """Test an invalid UTF-8 byte after 8KB rolls the user import back and flashes the error"""
+        lines = ['username,password,full_name,role,region']
+        lines += [f'agent{i},secret{i},Agent {i},field_agent,SW' for i in range(self.GOOD_ROWS)]
+        content = ('\n'.join(lines) + '\n').encode() + b'badagent,secret1,Bad \xff Agent,field_agent,SW\n'
+        assert content.index(b'\xff') > 8192
+
+        response = import_file(admin_client, '/admin/users/import', content)
+
+        assert response.status_code == 302
+        assert response.location.endswith('/admin/users/import')
+        assert any(category == 'danger' and message.startswith('Error processing file:')
+                   for category, message in flashes(admin_client))
+        assert upload_db.execute('SELECT COUNT(*) FROM users').fetchone()[0] == 1
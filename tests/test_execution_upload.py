@@ -0,0 +1,159 @@
+# tests/test_execution_upload.py
+# Integration tests for the admin execution upload (batched import and background jobs)
+
+import io
+import os
+import time
+import uuid
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from app_admin import (
+    SQL_BATCH_SIZE, UPLOAD_JOB_TIMEOUT, import_execution_file, close_db_connections,
+    write_upload_job, upload_jobs_dir
+)
+
+
+def make_csv(rows):
+    """Build an execution upload file from (urn, name, date, status) tuples"""
+    lines = ['URN,Retail Point Name,Date,Status']
+    lines += [','.join(row) for row in rows]
+    return ('\n'.join(lines) + '\n').encode()
+
+
+def run_import(app, content, filename='executions.csv'):
+    """Run the import synchronously with its own app context and connection"""
+    with app.app_context():
+        try:
+            return import_execution_file(FileStorage(stream=io.BytesIO(content), filename=filename))
+        finally:
+            close_db_connections(None)
+
+
+def message_text(messages):
+    return ' | '.join(message for _, message in messages)
+
+
+@pytest.mark.integration
+@pytest.mark.upload
+@pytest.mark.database
+class TestExecutionImportErrors:
+    """A row that breaks a schema constraint is reported and skipped, not the whole file"""
+
+    def test_invalid_status_skips_only_that_row(self, app, upload_db, tmp_path):
+        """Test mixed good/bad rows import the good ones and report the bad one"""
+        content = make_csv([
+            ('NEW-1', 'One', '2024-01-01', 'Completed'),
+            ('NEW-2', 'Two', '2024-01-02', 'Done'),
+            ('NEW-3', 'Three', '2024-01-03', 'Pending'),
+        ])
+
+        messages = run_import(app, content)
+
+        text = message_text(messages)
+        assert '2 executions imported' in text
+        assert '1 errors' in text
+        statuses = dict(upload_db.execute(
+            'SELECT o.urn, e.status FROM executions e JOIN outlets o ON o.id = e.outlet_id'
+        ).fetchall())
+        assert statuses == {'NEW-1': 'Completed', 'NEW-3': 'Pending'}
+
+        report = (tmp_path / 'uploads' / 'import_errors.txt').read_text()
+        assert 'Row 2:' in report
+        assert 'status_valid' in report
+
+    def test_bad_row_in_full_batch(self, app, upload_db):
+        """Test one bad row in a batch larger than SQL_BATCH_SIZE keeps the rest of the batch"""
+        rows = [(f'BULK-{i}', f'Outlet {i}', '2024-02-01', 'Completed') for i in range(SQL_BATCH_SIZE + 10)]
+        rows[7] = ('BULK-7', 'Outlet 7', '2024-02-01', 'Done')
+
+        messages = run_import(app, make_csv(rows))
+
+        text = message_text(messages)
+        assert f'{SQL_BATCH_SIZE + 9} executions imported' in text
+        assert '1 errors' in text
+        assert upload_db.execute('SELECT COUNT(*) FROM executions').fetchone()[0] == SQL_BATCH_SIZE + 9
+
+
+@pytest.mark.integration
+@pytest.mark.upload
+class TestExecutionUploadJobs:
+    """Background upload jobs and the status endpoint the upload page polls"""
+
+    def wait_for_job(self, client, status_url, timeout=30):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = client.get(status_url).get_json()
+            if job['status'] in ('done', 'failed'):
+                return job
+            time.sleep(0.05)
+        pytest.fail(f'Upload job did not finish within {timeout}s')
+
+    def test_upload_job_reports_counts(self, admin_client, upload_db):
+        """Test a queued upload finishes with the imported and error counts"""
+        content = make_csv([
+            ('NEW-1', 'One', '2024-01-01', 'Completed'),
+            ('NEW-2', 'Two', '2024-01-02', 'Done'),
+        ])
+        response = admin_client.post(
+            '/admin/executions/upload',
+            data={'file': (io.BytesIO(content), 'executions.csv')},
+            content_type='multipart/form-data',
+            headers={'Accept': 'application/json'}
+        )
+
+        assert response.status_code == 202
+        job = self.wait_for_job(admin_client, response.get_json()['status_url'])
+        assert job['status'] == 'done'
+        assert job['filename'] == 'executions.csv'
+        text = ' | '.join(message['message'] for message in job['messages'])
+        assert '1 executions imported' in text
+        assert '1 errors' in text
+
+    def test_upload_non_ascii_filename(self, admin_client, upload_db):
+        """Test a CSV whose name secure_filename strips down to its extension is still read as CSV"""
+        content = make_csv([('NEW-1', 'One', '2024-01-01', 'Completed')])
+        response = admin_client.post(
+            '/admin/executions/upload',
+            data={'file': (io.BytesIO(content), '報告.csv')},
+            content_type='multipart/form-data',
+            headers={'Accept': 'application/json'}
+        )
+
+        assert response.status_code == 202
+        job = self.wait_for_job(admin_client, response.get_json()['status_url'])
+        assert job['status'] == 'done'
+        assert job['filename'] == 'upload.csv'
+        assert upload_db.execute('SELECT COUNT(*) FROM executions').fetchone()[0] == 1
+
+    def test_unknown_job(self, admin_client, upload_db):
+        """Test polling a job that was never queued returns 404"""
+        response = admin_client.get(f'/admin/executions/upload/{uuid.uuid4().hex}')
+        assert response.status_code == 404
+
+    def test_job_queued_by_another_worker(self, admin_client, upload_db):
+        """Test the status comes from the shared job file, not the polling process"""
+        job_id = uuid.uuid4().hex
+        write_upload_job(job_id, 'other.csv', 'done', [('success', 'Upload complete: 3 executions imported')])
+
+        response = admin_client.get(f'/admin/executions/upload/{job_id}')
+
+        assert response.status_code == 200
+        assert response.get_json() == {
+            'job_id': job_id,
+            'status': 'done',
+            'filename': 'other.csv',
+            'messages': [{'category': 'success', 'message': 'Upload complete: 3 executions imported'}]
+        }
+
+    def test_abandoned_job_reported_failed(self, admin_client, upload_db):
+        """Test a job left running by a worker that exited is reported as failed"""
+        job_id = uuid.uuid4().hex
+        write_upload_job(job_id, 'lost.csv', 'running')
+        stale = time.time() - UPLOAD_JOB_TIMEOUT - 60
+        os.utime(os.path.join(upload_jobs_dir(), job_id + '.json'), (stale, stale))
+
+        job = admin_client.get(f'/admin/executions/upload/{job_id}').get_json()
+
+        assert job['status'] == 'failed'
+        assert 'interrupted' in job['messages'][0]['message']
@@ -0,0 +1,78 @@
+# tests/test_report_uploads.py
+# Integration tests for report uploads with rows that break schema constraints
+
+import pytest
+
+
+def outlet_row(urn, name, region='SW'):
+    return {'URN': urn, 'Retail Point Name': name, 'Address': '1 Test Street', 'Phone': '08012345678',
+            'Outlet Type': 'Shop', 'Region': region, 'State': 'Lagos', 'LGA': 'Ikeja'}
+
+
+def execution_row(urn, status='Completed'):
+    return {'Agent': 'Admin User', 'Outlet': 'Test Outlet', 'Date': '2024-01-15 10:30:00',
+            'Outlet URN': urn, 'Agent Username': 'admin', 'Status': status, 'Notes': ''}
+
+
+@pytest.fixture
+def report_outlet(upload_db):
+    """Existing outlet executions in the reports can point at"""
+    upload_db.execute('''
+        INSERT INTO outlets (urn, outlet_name, customer_name, address, phone, outlet_type, local_govt, state, region)
+        VALUES ('TEST/2024/SW/LA/000001', 'Test Outlet', 'Test Customer', '1 Test Street', '08012345678',
+                'Shop', 'Ikeja', 'Lagos', 'SW')
+    ''')
+    upload_db.commit()
+    return 'TEST/2024/SW/LA/000001'
+
+
+@pytest.mark.integration
+@pytest.mark.upload
+@pytest.mark.database
+class TestReportUploadErrors:
+    """A row that breaks a schema constraint is reported and skipped, not the whole request"""
+
+    def test_outlet_report_partial_success(self, client, upload_db):
+        """Test an outlet with an empty region is reported while the others are imported"""
+        response = client.post('/reports/upload', json={'sheet_name': 'Outlets', 'data': [
+            outlet_row('TEST/2024/SW/LA/000010', 'Good Outlet'),
+            outlet_row('TEST/2024/SW/LA/000011', 'No Region Outlet', region=''),
+            outlet_row('TEST/2024/SW/LA/000010', 'Good Outlet Renamed'),
+        ]})
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['report_type'] == 'outlet'
+        assert (data['imported'], data['updated'], data['errors']) == (1, 1, 1)
+        assert data['details'][0] == 'Imported new outlet: Good Outlet (TEST/2024/SW/LA/000010)'
+        assert data['details'][1].startswith('Error processing row TEST/2024/SW/LA/000011')
+        assert data['details'][2] == 'Updated outlet: Good Outlet Renamed (TEST/2024/SW/LA/000010)'
+        names = [row[0] for row in upload_db.execute('SELECT outlet_name FROM outlets')]
+        assert names == ['Good Outlet Renamed']
+
+    def test_execution_report_partial_success(self, client, upload_db, report_outlet):
+        """Test an execution with an invalid status is reported while the others are imported"""
+        response = client.post('/reports/upload', json={'sheet_name': 'Executions', 'data': [
+            execution_row(report_outlet),
+            execution_row(report_outlet, status='Done'),
+        ]})
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['report_type'] == 'execution'
+        assert (data['imported'], data['errors']) == (1, 1)
+        assert 'status_valid' in data['details'][0]
+        assert upload_db.execute('SELECT COUNT(*) FROM executions').fetchone()[0] == 1
+
+    def test_bulk_execution_upload_partial_success(self, client, upload_db, report_outlet):
+        """Test an execution without a date is reported while the others are imported"""
+        response = client.post('/reports/bulk_execution_upload', json={'executions': [
+            {'outlet_urn': report_outlet, 'agent_username': 'admin', 'execution_date': '2024-01-15 10:30:00'},
+            {'outlet_urn': report_outlet, 'agent_username': 'admin'},
+        ]})
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert (data['imported'], data['errors']) == (1, 1)
+        assert data['details'] == ['Error processing execution: NOT NULL constraint failed: executions.execution_date']
+        assert upload_db.execute('SELECT COUNT(*) FROM executions').fetchone()[0] == 1